@@ -3,7 +3,8 @@ import time
 import uuid
 from datetime import datetime
 from utils import (get_document_text, get_text_chunks, get_vector_store, 
-                  get_conversation_chain, show_thinking_process, generate_chat_title)
+                  get_conversation_chain, show_thinking_process, generate_chat_title,
+                  stream_chain_response)
 from database import ChatDatabase
 from web_search import WebSearchManager, SUGGESTED_PROMPTS
 
@@ -297,7 +298,7 @@ def init_database():
 
 @st.cache_resource  
 def init_web_search():
-    return WebSearchManager()
+    return WebSearchManager(on_error=st.error)
 
 db = init_database()
 web_search = init_web_search()
@@ -360,8 +361,10 @@ def process_user_message(user_input: str, has_document: bool):
         # Document-based response
         with st.spinner("🧠 Analyzing your document..."):
             try:
-                response = st.session_state.conversation({"question": user_input})
-                ai_response = response['answer']
+                # Tokens appear as Ollama generates them instead of after the whole answer
+                chain = st.session_state.conversation
+                response = stream_chain_response(chain, user_input, st.empty())
+                ai_response = response[chain.output_key]
                 source_docs = response.get('source_documents', [])
                 
                 # Store relevant context for display
@@ -410,7 +413,7 @@ def process_wikipedia_search(query: str):
             if results:
                 search_context = ""
                 for i, result in enumerate(results, 1):
-                    search_context += f"Article {i}: {result['title']}\n{result['summary']}\n\n"
+                    search_context += f"Article {i}: {result.title}\n{result.summary}\n\n"
                 
                 # REQUIREMENT 4: Enhanced response combining document context with Wikipedia
                 has_document = st.session_state.vectorstore is not None
@@ -424,14 +427,15 @@ Wikipedia Context:
 User Question: {query}"""
                     
                     try:
-                        response = st.session_state.conversation({"question": enhanced_prompt})
+                        chain = st.session_state.conversation
+                        response = stream_chain_response(chain, enhanced_prompt, st.empty())
                         ai_response = f"""🌟 **Great question!** Here's what I found combining your document with Wikipedia:
 
-{response['answer']}
+{response[chain.output_key]}
 
 📖 **Wikipedia Sources Used:**"""
                         for result in results:
-                            ai_response += f"\n• [{result['title']}]({result['url']}) 🔗"
+                            ai_response += f"\n• [{result.title}]({result.url}) 🔗"
                         
                     except:
                         # Fallback to bullet points format
@@ -443,8 +447,8 @@ User Question: {query}"""
 
 📋 **Key Findings:**"""
                         for i, result in enumerate(results, 1):
-                            ai_response += f"\n• **{result['title']}** - {result['summary'][:100]}... 🌟"
-                            ai_response += f"\n  � [Read full article]({result['url']})"
+                            ai_response += f"\n• **{result.title}** - {result.summary[:100]}... 🌟"
+                            ai_response += f"\n  � [Read full article]({result.url})"
                         
                         ai_response += "\n\n💡 **Helpful Insights:**\n• This information complements your uploaded document perfectly! 📄\n• You can ask me to combine these findings with your document content �"
                 else:
@@ -457,7 +461,7 @@ User Question: {query}"""
 
 📋 **Key Articles:**"""
                     for i, result in enumerate(results, 1):
-                        ai_response += f"\n• **{result['title']}** 🌟\n  📝 {result['summary'][:150]}...\n  🔗 [Read more]({result['url']})"
+                        ai_response += f"\n• **{result.title}** 🌟\n  📝 {result.summary[:150]}...\n  🔗 [Read more]({result.url})"
                     
                     ai_response += "\n\n💡 **Pro Tip:**\n• Upload a document and I can combine this Wikipedia info with your content! 📄✨\n• This creates super comprehensive, context-aware answers! �"
                 
@@ -511,7 +515,7 @@ def process_web_search(query: str):
             if results:
                 search_context = ""
                 for i, result in enumerate(results, 1):
-                    search_context += f"Website {i}: {result['title']}\n{result['summary']}\n\n"
+                    search_context += f"Website {i}: {result.title}\n{result.summary}\n\n"
                 
                 # REQUIREMENT 4: Enhanced response combining document context with web search
                 has_document = st.session_state.vectorstore is not None
@@ -525,14 +529,15 @@ Web Search Context:
 User Question: {query}"""
                     
                     try:
-                        response = st.session_state.conversation({"question": enhanced_prompt})
+                        chain = st.session_state.conversation
+                        response = stream_chain_response(chain, enhanced_prompt, st.empty())
                         ai_response = f"""🌟 **Excellent question!** Here's what I found combining your document with web search:
 
-{response['answer']}
+{response[chain.output_key]}
 
 🌐 **Web Sources Used:**"""
                         for result in results:
-                            ai_response += f"\n• [{result['title']}]({result['url']}) 🔗"
+                            ai_response += f"\n• [{result.title}]({result.url}) 🔗"
                         
                     except:
                         # Fallback to bullet points format
@@ -544,8 +549,8 @@ User Question: {query}"""
 
 📋 **Key Findings:**"""
                         for i, result in enumerate(results, 1):
-                            ai_response += f"\n• **{result['title']}** - {result['summary'][:100]}... 🌟"
-                            ai_response += f"\n  🔗 [Visit website]({result['url']})"
+                            ai_response += f"\n• **{result.title}** - {result.summary[:100]}... 🌟"
+                            ai_response += f"\n  🔗 [Visit website]({result.url})"
                         
                         ai_response += "\n\n💡 **Helpful Insights:**\n• This web information enhances your document analysis! 📄\n• Ask me to combine these findings with your document content �"
                 else:
@@ -558,7 +563,7 @@ User Question: {query}"""
 
 📋 **Top Results:**"""
                     for i, result in enumerate(results, 1):
-                        ai_response += f"\n• **{result['title']}** 🌟\n  📝 {result['summary'][:150]}...\n  🔗 [Visit site]({result['url']})"
+                        ai_response += f"\n• **{result.title}** 🌟\n  📝 {result.summary[:150]}...\n  🔗 [Visit site]({result.url})"
                     
                     ai_response += "\n\n💡 **Pro Tip:**\n• Upload a document and I can combine this web info with your content! 📄✨\n• This creates incredibly comprehensive, context-aware answers! �"
                 
@@ -5,6 +5,8 @@
 AI_MODEL = "qwen2.5:0.5b-instruct"  # Lightweight but capable model
 AI_TEMPERATURE = 0.2    # Balanced creativity for structured responses
 AI_MAX_TOKENS = 1024    # Longer responses for comprehensive answers
+AI_NUM_CTX = 4096       # Upper bound on the Ollama context window (sized down to fit the prompt)
+AI_NUM_PREDICT = 512    # Max generated tokens; ample for the bullet-point answer format
 
 # Document Processing - Optimized for better context
 CHUNK_SIZE = 800        # Larger chunks for better context retention
@@ -28,9 +30,11 @@ DB_NAME = "notebook_ai.db"
 AUTO_BACKUP = True      # Automatically backup database
 
 # Performance Settings - Optimized for speed
-BATCH_SIZE = 6          # Increased batch size for faster processing
+BATCH_SIZE = 32         # Embedding batch size; larger batches amortize per-call overhead
 NUM_THREADS = 6         # More threads for parallel processing
 ENABLE_GPU = False      # Use GPU if available (requires CUDA)
+QUANTIZE_EMBEDDINGS = True # int8 dynamic quantization of the CPU embedding model
+EMBEDDING_BF16 = True   # bf16 embeddings via IPEX on CPUs with native bf16 (else int8)
 
 # File Upload Settings
 MAX_FILE_SIZE = 15      # Increased max file size to 15MB
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Tests for the legacy document/chat helpers
+"""
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("langchain")
+
+from utils import generate_chat_title
+
+
+def test_chat_title_skips_filler_words():
+    """Common question words are left out of the title"""
+    assert generate_chat_title("What is the capital of France?") == "Capital France"
+
+
+def test_chat_title_keeps_accented_words_whole():
+    """Accented letters are part of the word, not a boundary"""
+    assert generate_chat_title("¿Qué es la fotosíntesis?") == "Qué Fotosíntesis"
+
+
+def test_chat_title_non_latin_words():
+    """Words in non-Latin scripts are picked like any other"""
+    assert generate_chat_title("Что такое фотосинтез") == "Что Такое Фотосинтез"
+    assert generate_chat_title("光合作用とは") == "光合作用とは Discussion"
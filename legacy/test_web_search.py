@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the legacy web search manager (network sources are stubbed out)
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("ddgs")
+pytest.importorskip("langchain")
+
+import web_search
+from web_search import SearchHit, WebSearchManager
+
+
+def test_combined_search_without_sources():
+    """Disabling both sources returns no results instead of raising"""
+    with WebSearchManager() as manager:
+        assert manager.combined_search("python", include_wikipedia=False, include_web=False) == []
+
+
+class SlowSearchManager(WebSearchManager):
+    """Both sources answer after a fixed delay, without touching the network"""
+    
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+    
+    def _fetch_wikipedia(self, query, max_results):
+        time.sleep(self.delay)
+        return (SearchHit(query, "https://en.wikipedia.org", "summary", "Wikipedia"),)
+    
+    def _fetch_duckduckgo(self, query, max_results):
+        time.sleep(self.delay)
+        return (SearchHit(query, "https://duckduckgo.com", "summary", "DuckDuckGo"),)
+
+
+def test_combined_search_many_ignores_queue_time(monkeypatch):
+    """Queries queued behind a full worker pool still get their full deadline"""
+    monkeypatch.setattr(web_search, "_SOURCE_TIMEOUT", 0.5)
+    monkeypatch.setattr(web_search, "_COMBINED_TIMEOUT", 1.0)
+    queries = [f"query {i}" for i in range(6)]  # 12 jobs on 4 workers: three rounds of 0.3s
+    
+    with SlowSearchManager(delay=0.3) as manager:
+        results = manager.combined_search_many(queries)
+    
+    assert [len(hits) for hits in results] == [2] * len(queries)
+    assert [hits[0].title for hits in results] == queries
+
+
+def test_combined_search_drops_slow_source(monkeypatch):
+    """A source that runs past its deadline is skipped"""
+    monkeypatch.setattr(web_search, "_SOURCE_TIMEOUT", 0.1)
+    
+    with SlowSearchManager(delay=0.3) as manager:
+        assert manager.combined_search("python") == []
+
+
+def test_combined_search_counts_queue_time(monkeypatch):
+    """A single search stays within its budget even when abandoned jobs still hold the workers"""
+    monkeypatch.setattr(web_search, "_SOURCE_TIMEOUT", 0.1)
+    monkeypatch.setattr(web_search, "_COMBINED_TIMEOUT", 0.2)
+    
+    with SlowSearchManager(delay=1.0) as manager:
+        for _ in range(3):  # The third call finds all 4 workers busy
+            start = time.perf_counter()
+            assert manager.combined_search("python") == []
+            assert time.perf_counter() - start < 0.5
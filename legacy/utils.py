@@ -1,18 +1,37 @@
 import io
+import re
+import contextlib
+import functools
+import itertools
+import threading
 import time
 import uuid
 from datetime import datetime
+from cachetools import LRUCache
 from pypdf import PdfReader
 import docx
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+from langchain_community.vectorstores import FAISS
 from langchain_community.llms import Ollama
 from langchain.memory import ConversationBufferMemory
 from langchain.chains import ConversationalRetrievalChain, RetrievalQA
 import streamlit as st
 from langchain.prompts import PromptTemplate
+from langchain.callbacks.base import BaseCallbackHandler
 from database import ChatDatabase
+from vector_cache import content_hash
+# PyMuPDF extracts PDF text far faster than pypdf; it is optional because of its AGPL license
+try:
+    import fitz
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
 try:
     import config
 except ImportError:
@@ -21,6 +40,8 @@ except ImportError:
         AI_MODEL = "qwen2.5:0.5b-instruct"
         AI_TEMPERATURE = 0.1
         AI_MAX_TOKENS = 300
+        AI_NUM_CTX = 4096
+        AI_NUM_PREDICT = 512
         CHUNK_SIZE = 500
         CHUNK_OVERLAP = 50
         MAX_CHUNKS = 15
@@ -28,41 +49,56 @@ except ImportError:
         SEARCH_K = 3
         SEARCH_FETCH_K = 12
         SEARCH_LAMBDA = 0.6
-        BATCH_SIZE = 4
+        BATCH_SIZE = 32
         NUM_THREADS = 4
+        QUANTIZE_EMBEDDINGS = True
+        EMBEDDING_BF16 = True
+
+def _extract_pdf_text(pdf_bytes):
+    """
+    Extract PDF text with PyMuPDF in a single pass
+    """
+    # Sequential on purpose: PyMuPDF reads tens of pages in milliseconds, while a
+    # worker process would re-import this module (streamlit, langchain, torch)
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_doc:
+        return "\n".join(page.get_text("text") for page in pdf_doc)
 
 def get_document_text(file):
     """
     Extracts text from an uploaded document
     """
-    text = ""
     file_extension = file.name.split('.')[-1].lower()
+    file_bytes = file.getvalue()
 
     if file_extension == 'pdf':
-        pdf_reader = PdfReader(io.BytesIO(file.read()))
-        for page in pdf_reader.pages:
-            text += page.extract_text()
+        if PYMUPDF_AVAILABLE:
+            try:
+                return _extract_pdf_text(file_bytes)
+            except Exception as e:
+                print(f"⚠️ PyMuPDF failed, falling back to pypdf: {e}")
+        pdf_reader = PdfReader(io.BytesIO(file_bytes))
+        return "".join(page.extract_text() or "" for page in pdf_reader.pages)
     elif file_extension == 'docx':
-        doc = docx.Document(io.BytesIO(file.read()))
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        doc = docx.Document(io.BytesIO(file_bytes))
+        return "".join(para.text + "\n" for para in doc.paragraphs)
     elif file_extension == 'txt':
-        stringio = io.StringIO(file.getvalue().decode("utf-8"))
-        text = stringio.read()
+        return file_bytes.decode("utf-8")
     
-    return text 
+    return ""
 
-def get_text_chunks(text):
+# Per-process memo of recent documents, keyed on content hash (Redis remains the shared tier)
+_MEMO_LOCK = threading.Lock()
+_CHUNKS_MEMO = LRUCache(maxsize=32)
+_VECTOR_STORE_MEMO = LRUCache(maxsize=8)
+
+@functools.lru_cache(maxsize=1)
+def _get_text_splitter(chunk_size, chunk_overlap):
     """
-    Splits text into well-structured chunks preserving document meaning
+    Build the text splitter once per chunking configuration
     """
-    # Minimal text cleaning - preserve structure and formatting
-    text = text.strip()
-    
-    # Enhanced text splitter with configurable chunks for better granularity
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=config.CHUNK_SIZE,   # Configurable chunk size
-        chunk_overlap=config.CHUNK_OVERLAP,  # Configurable overlap
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
         length_function=len,
         separators=[
             "\n\n\n",    # Triple newlines (major sections)
@@ -78,82 +114,128 @@ def get_text_chunks(text):
             ""           # Characters
         ]
     )
+
+# Any letter or digit; the regex scan runs in C instead of a per-character generator
+_ALNUM_RE = re.compile(r"[^\W_]")
+
+def _merge_small_chunks(chunks, min_chars, max_chars):
+    """
+    Greedily merge consecutive chunks until each reaches min_chars without exceeding max_chars
+    """
+    merged = []
+    buffer = ""
+    for chunk in chunks:
+        if not buffer:
+            buffer = chunk
+        elif len(buffer) < min_chars and len(buffer) + 1 + len(chunk) <= max_chars:
+            buffer = f"{buffer}\n{chunk}"
+        else:
+            merged.append(buffer)
+            buffer = chunk
+    
+    if buffer:
+        # A short tail joins the previous chunk when it fits
+        if merged and len(buffer) < min_chars and len(merged[-1]) + 1 + len(buffer) <= max_chars:
+            merged[-1] = f"{merged[-1]}\n{buffer}"
+        else:
+            merged.append(buffer)
+    
+    return merged
+
+def get_text_chunks(text):
+    """
+    Splits text into well-structured chunks, reusing the result for a document seen before
+    """
+    key = (content_hash(text), config.CHUNK_SIZE, config.CHUNK_OVERLAP, config.MAX_CHUNKS)
+    with _MEMO_LOCK:
+        chunks = _CHUNKS_MEMO.get(key)
+    if chunks is None:
+        chunks = _split_text_chunks(text)
+        with _MEMO_LOCK:
+            _CHUNKS_MEMO[key] = chunks
+    return list(chunks)
+
+def _split_text_chunks(text):
+    """
+    Splits text into well-structured chunks preserving document meaning
+    """
+    # Minimal text cleaning - preserve structure and formatting
+    text = text.strip()
+    
+    # Enhanced text splitter with configurable chunks for better granularity
+    text_splitter = _get_text_splitter(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
     chunks = text_splitter.split_text(text)
     
-    # Enhanced filtering - preserve meaningful chunks
-    meaningful_chunks = []
-    for i, chunk in enumerate(chunks):
-        chunk = chunk.strip()
-        # Keep chunks with substantial content
-        if len(chunk) > 20 and any(c.isalnum() for c in chunk):
-            # Add section context for better understanding
-            if i > 0 and len(chunk) < 200:  # For short chunks, add context
-                prev_chunk = chunks[i-1].strip()[-100:] if i > 0 else ""
-                if prev_chunk and not chunk.startswith(prev_chunk[-50:]):
-                    chunk = f"[Context: ...{prev_chunk[-50:]}] {chunk}"
-            meaningful_chunks.append(chunk)
+    # Drop fragments without any real content
+    chunks = [chunk.strip() for chunk in chunks]
+    chunks = [chunk for chunk in chunks if _ALNUM_RE.search(chunk)]
     
-    # Keep configurable number of chunks for better diversity
-    if len(meaningful_chunks) > config.MAX_CHUNKS:
-        # Sample across the document to maintain diversity
-        step = len(meaningful_chunks) // config.MAX_CHUNKS
-        meaningful_chunks = meaningful_chunks[::max(1, step)][:config.MAX_CHUNKS]
+    # Merge short fragments into their neighbours so every chunk carries real context
+    merged_chunks = _merge_small_chunks(
+        chunks,
+        min_chars=config.CHUNK_SIZE // 2,
+        max_chars=config.CHUNK_SIZE + config.CHUNK_OVERLAP
+    )
+    meaningful_chunks = [chunk for chunk in merged_chunks if len(chunk) > 20]
+    
+    # Keep configurable number of chunks, sampled evenly from start to end of the document
+    total = len(meaningful_chunks)
+    if total > config.MAX_CHUNKS:
+        meaningful_chunks = [meaningful_chunks[i * total // config.MAX_CHUNKS] for i in range(config.MAX_CHUNKS)]
     
     return meaningful_chunks
 
 
-def get_vector_store(chunks):
+def get_chunk_metadata(chunks):
     """
-    Creates a high-quality vector store optimized for diverse retrieval
+    Builds the per-chunk metadata stored with each vector (the chunk text itself is the document)
     """
-    # Add chunk metadata for better retrieval diversity
-    metadatas = []
-    for i, chunk in enumerate(chunks):
-        metadata = {
+    total = len(chunks)
+    return [
+        {
             "chunk_id": i,
             "chunk_length": len(chunk),
-            "chunk_preview": chunk[:100],  # Preview for debugging
-            "chunk_position": "start" if i < len(chunks) // 3 else "middle" if i < 2 * len(chunks) // 3 else "end"
+            "chunk_position": "start" if i < total // 3 else "middle" if i < 2 * total // 3 else "end"
         }
-        metadatas.append(metadata)
-    
-    # Use optimized embedding model with better parameters
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
-        model_kwargs={
-            'device': 'cpu',
-            'trust_remote_code': False
-        },
-        encode_kwargs={
-            'normalize_embeddings': True,
-            'batch_size': config.BATCH_SIZE  # Configurable batch size
-        }
-    )
-    
-    # Create vector store with ChromaDB
-    import tempfile
-    import os
+        for i, chunk in enumerate(chunks)
+    ]
+
+def get_vector_store(chunks, metadatas=None):
+    """
+    Creates a high-quality vector store optimized for diverse retrieval
+    """
+    # Add chunk metadata for better retrieval diversity
+    if metadatas is None:
+        metadatas = get_chunk_metadata(chunks)
     
-    # Create a temporary directory for ChromaDB
-    temp_dir = tempfile.mkdtemp()
-    persist_directory = os.path.join(temp_dir, "chroma_db")
+    # In-process L1 in front of the Redis cache: identical chunks reuse the built store
+    key = content_hash("\x00".join(chunks) + repr(metadatas))
+    with _MEMO_LOCK:
+        vector_store = _VECTOR_STORE_MEMO.get(key)
+    if vector_store is None:
+        vector_store = _build_vector_store(chunks, metadatas)
+        with _MEMO_LOCK:
+            _VECTOR_STORE_MEMO[key] = vector_store
+    return vector_store
+
+def _build_vector_store(chunks, metadatas):
+    """
+    Embeds the chunks and indexes them with FAISS
+    """
+    # Use the same (quantized) embedding model as queries and cached stores
+    embeddings = get_optimized_embeddings()
     
-    vector_store = Chroma.from_texts(
+    # In-process FAISS index; serializes to bytes for the Redis vector cache
+    vector_store = FAISS.from_texts(
         texts=chunks, 
         embedding=embeddings,
-        metadatas=metadatas,
-        persist_directory=persist_directory
+        metadatas=metadatas
     )
     
     return vector_store
 
-def get_conversation_chain(vector_store):
-    """
-    Creates an optimized conversation chain with enhanced, structured responses
-    """
-
-    # Enhanced, friendly prompt for warm, bullet-point responses with emojis
-    template = """You are SAVIN AI, a warm and friendly intelligent assistant! 😊 I ALWAYS provide helpful responses in bullet points with emojis to make information easy to understand and engaging.
+# Enhanced, friendly prompt for warm, bullet-point responses with emojis
+_PROMPT_TEMPLATE = """You are SAVIN AI, a warm and friendly intelligent assistant! 😊 I ALWAYS provide helpful responses in bullet points with emojis to make information easy to understand and engaging.
 
 CONTEXT INFORMATION:
 {context}
@@ -189,39 +271,59 @@ MANDATORY RESPONSE FORMAT (Use EXACTLY this structure with bullet points and emo
 
 IMPORTANT: Never deviate from bullet point format. Always be warm, supportive, and use emojis throughout. Keep language simple and friendly."""
 
-    # Create prompt template
-    CUSTOM_PROMPT = PromptTemplate(
-        template=template, 
-        input_variables=['context', 'question']
-    )
+# Parsed once at import; only the retriever differs between documents
+CUSTOM_PROMPT = PromptTemplate(
+    template=_PROMPT_TEMPLATE, 
+    input_variables=['context', 'question']
+)
 
+# Retrieved chunks stuffed into each prompt
+_RETRIEVER_K = 4
+
+def _context_window():
+    """
+    Smallest power-of-two context that fits the prompt, the retrieved chunks and the answer
+    """
+    # Merged chunks are at most CHUNK_SIZE + CHUNK_OVERLAP characters; allow ~500 for the question
+    prompt_chars = len(_PROMPT_TEMPLATE) + _RETRIEVER_K * (config.CHUNK_SIZE + config.CHUNK_OVERLAP) + 500
+    # Roughly 3 characters per token keeps the estimate on the safe side for emoji-heavy text
+    needed = prompt_chars // 3 + config.AI_NUM_PREDICT
+    return min(config.AI_NUM_CTX, 1 << (needed - 1).bit_length())
+
+@functools.lru_cache(maxsize=1)
+def _get_llm():
+    """
+    Build the Ollama client once and share it across conversation chains
+    """
     # Optimized LLM with settings for comprehensive, structured responses  
-    llm = Ollama(
+    return Ollama(
         model=config.AI_MODEL,
         temperature=config.AI_TEMPERATURE,  # Low temperature for consistent responses
-        num_ctx=8192,     # Increased context window for better understanding
-        num_predict=1024,  # Allow longer responses for comprehensive answers
+        num_ctx=_context_window(),  # Sized to the prompt; smaller KV cache, faster attention
+        num_predict=config.AI_NUM_PREDICT,  # Bullet-point answers fit comfortably
         top_k=10,          # More focused sampling
         top_p=0.8,        # Balanced creativity and focus
         repeat_penalty=1.2, # Prevent repetition
         num_thread=config.NUM_THREADS
     )
 
+def get_conversation_chain(vector_store):
+    """
+    Creates an optimized conversation chain with enhanced, structured responses
+    """
     # Enhanced retriever for comprehensive results
     optimized_retriever = vector_store.as_retriever(
         search_type=config.SEARCH_TYPE,  # Maximum Marginal Relevance for diverse results
         search_kwargs={
-            "k": 4,           # Get more relevant chunks for comprehensive answers
+            "k": _RETRIEVER_K,  # Get more relevant chunks for comprehensive answers
             "fetch_k": 15,    # Consider more candidates for better context
             "lambda_mult": 0.5  # Balance between relevance and diversity
         }
     )
 
     # Create a simple chain without memory to avoid interference
-    from langchain.chains import RetrievalQA
-    
     conversation_chain = RetrievalQA.from_chain_type(
-        llm=llm,
+        llm=_get_llm(),
         chain_type="stuff",  # Stuff all retrieved docs into prompt
         retriever=optimized_retriever,
         chain_type_kwargs={"prompt": CUSTOM_PROMPT},
@@ -230,22 +332,33 @@ IMPORTANT: Never deviate from bullet point format. Always be warm, supportive, a
 
     return conversation_chain
 
-def simulate_typing_effect(text, container):
+class StreamlitTokenHandler(BaseCallbackHandler):
     """
-    Simulate typing effect by gradually revealing text
+    Render LLM tokens into a Streamlit placeholder as Ollama streams them
     """
-    import time
-    words = text.split()
-    displayed_text = ""
     
-    for i, word in enumerate(words):
-        displayed_text += word + " "
-        container.markdown(displayed_text + "▌")
-        if i % 5 == 0:  # Update every 5 words to balance smoothness and performance
-            time.sleep(0.1)
+    def __init__(self, container, min_interval=0.05):
+        self.container = container
+        self.min_interval = min_interval  # Each markdown call re-renders the whole message
+        self.tokens = []
+        self._last_render = 0.0
+    
+    def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+        now = time.monotonic()
+        if now - self._last_render >= self.min_interval:
+            self.container.markdown("".join(self.tokens) + "▌")
+            self._last_render = now
+
+def stream_chain_response(chain, question, container):
+    """
+    Run the conversation chain while streaming its answer into container
+    """
+    response = chain({chain.input_key: question}, callbacks=[StreamlitTokenHandler(container)])
     
     # Final display without cursor
-    container.markdown(text)
+    container.markdown(response[chain.output_key])
+    return response
 
 def show_thinking_process(container, steps, total_steps=5):
     """
@@ -270,16 +383,19 @@ def show_thinking_process(container, steps, total_steps=5):
     
     return progress_bar, status_container
 
+# Words of 3+ letters or digits (any script) that are not common question/filler words
+_TITLE_WORD_RE = re.compile(
+    r"\b(?!(?:what|the|how|can|you|tell|about|and|but|for|with)\b)[^\W_]{3,}"
+)
+
 def generate_chat_title(first_message: str) -> str:
     """
     Generate a smart chat title based on the first message
     """
-    # Extract key words and create a meaningful title
-    words = first_message.lower().split()
-    
-    # Remove common words
-    stop_words = {'what', 'is', 'the', 'how', 'can', 'you', 'tell', 'me', 'about', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-    important_words = [word for word in words if word not in stop_words and len(word) > 2]
+    # Extract the first few key words (common words skipped by the pattern itself)
+    important_words = [
+        match.group() for match in itertools.islice(_TITLE_WORD_RE.finditer(first_message.lower()), 3)
+    ]
     
     if len(important_words) >= 2:
         title = ' '.join(important_words[:3]).title()
@@ -290,11 +406,84 @@ def generate_chat_title(first_message: str) -> str:
     
     return title[:50]  # Limit title length
 
+class InferenceModeEmbeddings(HuggingFaceEmbeddings):
+    """
+    HuggingFaceEmbeddings that encodes under torch.inference_mode (no autograd bookkeeping)
+    """
+    use_bf16: bool = False
+    
+    def embed_documents(self, texts):
+        texts = [text.replace("\n", " ") for text in texts]
+        with _inference_context(self.use_bf16):
+            embeddings = self.client.encode(
+                texts, convert_to_numpy=True, show_progress_bar=False, **self.encode_kwargs
+            )
+        return embeddings.tolist()
+    
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def _inference_context(bf16=False):
+    """
+    Context for encoder forward passes; a no-op when torch is unavailable
+    """
+    if not TORCH_AVAILABLE:
+        return contextlib.nullcontext()
+    if bf16:
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        stack.enter_context(torch.cpu.amp.autocast(dtype=torch.bfloat16))
+        return stack
+    return torch.inference_mode()
+
+def _cpu_has_native_bf16():
+    """
+    Check for AVX512-BF16/AMX-BF16; emulated bf16 is slower than FP32
+    """
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            flags = cpuinfo.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+def _optimize_embeddings_bf16(embeddings):
+    """
+    Run the encoder in bf16 through Intel Extension for PyTorch; returns None if unavailable
+    """
+    if not TORCH_AVAILABLE or not _cpu_has_native_bf16():
+        return None
+    try:
+        import intel_extension_for_pytorch as ipex
+        embeddings.client.eval()
+        ipex.optimize(embeddings.client, dtype=torch.bfloat16, inplace=True)
+        embeddings.use_bf16 = True
+        return embeddings
+    except Exception as e:
+        print(f"⚠️ bf16 embedding optimization skipped: {e}")
+        return None
+
+def _quantize_embeddings(embeddings):
+    """
+    Swap the encoder's Linear layers for int8 dynamically quantized ones (CPU only)
+    """
+    try:
+        torch.quantization.quantize_dynamic(
+            embeddings.client,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+            inplace=True
+        )
+    except Exception as e:
+        print(f"⚠️ Embedding quantization skipped: {e}")
+    return embeddings
+
+@st.cache_resource
 def get_optimized_embeddings():
     """
-    Get optimized embeddings model for consistent performance
+    Get optimized embeddings model, loaded once per process and shared across sessions
     """
-    return HuggingFaceEmbeddings(
+    embeddings = InferenceModeEmbeddings(
         model_name="sentence-transformers/all-MiniLM-L6-v2",
         model_kwargs={
             'device': 'cpu',
@@ -304,4 +493,10 @@ def get_optimized_embeddings():
             'normalize_embeddings': True,
             'batch_size': config.BATCH_SIZE
         }
-    )
\ No newline at end of file
+    )
+    # Prefer bf16 on CPUs that support it natively, otherwise int8 quantization
+    if config.EMBEDDING_BF16 and _optimize_embeddings_bf16(embeddings):
+        return embeddings
+    if config.QUANTIZE_EMBEDDINGS:
+        embeddings = _quantize_embeddings(embeddings)
+    return embeddings
\ No newline at end of file
@@ -3,20 +3,36 @@ Redis-based vector caching system for SAVIN AI
 Provides lightning-fast vector operations and caching
 """
 import time
-import pickle
 import hashlib
 import json
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, List, Any, Optional, Union
 import streamlit as st
 
 # Redis import with fallback
 try:
     import redis
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
     print("⚠️ Redis not available - install with: pip install redis")
 
+# xxhash is much faster than SHA-256 for cache keys; fall back to hashlib without it
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# msgpack for cache payloads (no pickle on load); JSON is the fallback encoding
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 try:
     import config
 except ImportError:
@@ -27,39 +43,87 @@ except ImportError:
         VECTOR_CACHE_TTL = 3600  # 1 hour
         ENABLE_REDIS_CACHE = True
 
+# Strings are encoded in slices of this many characters so large documents are never copied whole
+_HASH_SLICE = 1 << 20
+
+def content_hash(data: Union[str, bytes]) -> str:
+    """Non-cryptographic content hash for cache keys (collisions only cost a cache miss)"""
+    hasher = xxhash.xxh3_64() if XXHASH_AVAILABLE else hashlib.sha256()
+    if isinstance(data, bytes):
+        hasher.update(data)
+    else:
+        for start in range(0, len(data), _HASH_SLICE):
+            hasher.update(data[start:start + _HASH_SLICE].encode())
+    return hasher.hexdigest()[:16]
+
+# Keys fetched per SCAN call and deleted per DEL call
+_SCAN_BATCH = 500
+
+def _pack(data: Any) -> bytes:
+    """Serialize a cache payload of plain lists/dicts/strings"""
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data).encode()
+
+def _unpack(payload: bytes) -> Any:
+    """Deserialize a payload written by _pack"""
+    if MSGPACK_AVAILABLE:
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
 class VectorCacheManager:
     """Redis-based vector store caching for ultra-fast responses"""
     
     def __init__(self):
-        """Initialize Redis connection"""
-        self.redis_client = None
+        """Configure the cache; the Redis connection is opened on first use"""
         self.enabled = config.ENABLE_REDIS_CACHE and REDIS_AVAILABLE
-        
-        if self.enabled:
-            try:
-                self.redis_client = redis.Redis(
-                    host=config.REDIS_HOST,
-                    port=config.REDIS_PORT,
-                    db=config.REDIS_DB,
-                    decode_responses=False  # Keep binary for pickle
-                )
-                # Test connection
-                self.redis_client.ping()
-                print("✅ Redis cache connected successfully")
-            except Exception as e:
-                print(f"⚠️ Redis cache unavailable: {e}")
-                self.enabled = False
-                self.redis_client = None
+        self._redis_client = None
+        self._probed = False
+        self._connect_lock = threading.Lock()
+    
+    @property
+    def redis_client(self):
+        """Redis connection, opened and pinged once on first access (never at import)"""
+        if not self._probed and self.enabled:
+            with self._connect_lock:
+                if not self._probed:
+                    self._connect()
+        return self._redis_client
+    
+    def _connect(self):
+        """Open the Redis connection with short timeouts so a missing server can't stall the app"""
+        self._probed = True
+        try:
+            client = redis.Redis(
+                host=config.REDIS_HOST,
+                port=config.REDIS_PORT,
+                db=config.REDIS_DB,
+                decode_responses=False,  # Keep binary for FAISS/msgpack payloads
+                socket_connect_timeout=0.25,
+                socket_timeout=0.5,
+                retry=Retry(NoBackoff(), 0)  # Fail fast; a cache miss is cheaper than waiting
+            )
+            # Test connection
+            client.ping()
+            self._redis_client = client
+            print("✅ Redis cache connected successfully")
+        except Exception as e:
+            print(f"⚠️ Redis cache unavailable: {e}")
+            self.enabled = False
+    
+    def _get_document_hash(self, document_text: Union[str, bytes]) -> str:
+        """Generate unique hash for document content (raw upload bytes or extracted text)"""
+        return content_hash(document_text)
     
-    def _get_document_hash(self, document_text: str) -> str:
-        """Generate unique hash for document content"""
-        return hashlib.sha256(document_text.encode()).hexdigest()[:16]
+    def _get_search_cache_key(self, query: str, search_type: str) -> str:
+        """Generate cache key for search results"""
+        return f"savin_ai:search:{search_type}:{content_hash(query)}"
     
     def _get_cache_key(self, doc_hash: str, cache_type: str) -> str:
         """Generate cache key for Redis"""
         return f"savin_ai:{cache_type}:{doc_hash}"
     
-    def cache_vector_store(self, document_text: str, vector_store, chunks: List[str], metadata: List[Dict]) -> bool:
+    def cache_vector_store(self, document_text: Union[str, bytes], vector_store, chunks: List[str], metadata: List[Dict]) -> bool:
         """Cache vector store with Redis"""
         if not self.enabled or not self.redis_client:
             return False
@@ -67,28 +131,26 @@ class VectorCacheManager:
         try:
             doc_hash = self._get_document_hash(document_text)
             
-            # Cache vector store
             vector_key = self._get_cache_key(doc_hash, "vectors")
-            vector_data = pickle.dumps({
-                'vector_store': vector_store.serialize_to_bytes(),
-                'chunks': chunks,
-                'metadata': metadata,
-                'timestamp': time.time()
-            })
-            
-            self.redis_client.setex(
-                vector_key, 
-                config.VECTOR_CACHE_TTL, 
-                vector_data
-            )
-            
-            # Cache document text for reference
+            meta_key = self._get_cache_key(doc_hash, "meta")
             text_key = self._get_cache_key(doc_hash, "text")
-            self.redis_client.setex(
-                text_key, 
-                config.VECTOR_CACHE_TTL, 
-                document_text.encode()
-            )
+            
+            # One round trip for all three writes
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                # Cache the FAISS bytes as-is and chunks/metadata separately
+                pipe.setex(vector_key, config.VECTOR_CACHE_TTL, vector_store.serialize_to_bytes())
+                pipe.setex(meta_key, config.VECTOR_CACHE_TTL, _pack({
+                    'chunks': chunks,
+                    'metadata': metadata,
+                    'timestamp': time.time()
+                }))
+                # Cache document text for reference
+                pipe.setex(
+                    text_key,
+                    config.VECTOR_CACHE_TTL,
+                    document_text if isinstance(document_text, bytes) else document_text.encode()
+                )
+                pipe.execute()
             
             return True
             
@@ -96,7 +158,7 @@ class VectorCacheManager:
             print(f"⚠️ Error caching vectors: {e}")
             return False
     
-    def get_cached_vector_store(self, document_text: str):
+    def get_cached_vector_store(self, document_text: Union[str, bytes]):
         """Retrieve cached vector store"""
         if not self.enabled or not self.redis_client:
             return None
@@ -104,10 +166,11 @@ class VectorCacheManager:
         try:
             doc_hash = self._get_document_hash(document_text)
             vector_key = self._get_cache_key(doc_hash, "vectors")
+            meta_key = self._get_cache_key(doc_hash, "meta")
             
-            cached_data = self.redis_client.get(vector_key)
-            if cached_data:
-                data = pickle.loads(cached_data)
+            vector_bytes, meta_bytes = self.redis_client.mget(vector_key, meta_key)
+            if vector_bytes and meta_bytes:
+                data = _unpack(meta_bytes)
                 
                 # Reconstruct vector store from cached bytes
                 from langchain_community.vectorstores import FAISS
@@ -115,7 +178,7 @@ class VectorCacheManager:
                 
                 embeddings = get_optimized_embeddings()
                 vector_store = FAISS.deserialize_from_bytes(
-                    data['vector_store'], 
+                    vector_bytes, 
                     embeddings
                 )
                 
@@ -137,8 +200,7 @@ class VectorCacheManager:
             return False
         
         try:
-            query_hash = hashlib.sha256(query.encode()).hexdigest()[:12]
-            cache_key = f"savin_ai:search:{search_type}:{query_hash}"
+            cache_key = self._get_search_cache_key(query, search_type)
             
             cache_data = {
                 'results': results,
@@ -149,7 +211,7 @@ class VectorCacheManager:
             self.redis_client.setex(
                 cache_key,
                 1800,  # 30 minutes for search results
-                pickle.dumps(cache_data)
+                _pack(cache_data)
             )
             
             return True
@@ -164,12 +226,11 @@ class VectorCacheManager:
             return None
         
         try:
-            query_hash = hashlib.sha256(query.encode()).hexdigest()[:12]
-            cache_key = f"savin_ai:search:{search_type}:{query_hash}"
+            cache_key = self._get_search_cache_key(query, search_type)
             
             cached_data = self.redis_client.get(cache_key)
             if cached_data:
-                data = pickle.loads(cached_data)
+                data = _unpack(cached_data)
                 return data['results']
         
         except Exception as e:
@@ -183,15 +244,26 @@ class VectorCacheManager:
             return 0
         
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
-            return 0
+            # SCAN in batches instead of KEYS, which blocks Redis while it walks the keyspace
+            deleted = 0
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=_SCAN_BATCH):
+                batch.append(key)
+                if len(batch) >= _SCAN_BATCH:
+                    deleted += self.redis_client.delete(*batch)
+                    batch.clear()
+            if batch:
+                deleted += self.redis_client.delete(*batch)
+            return deleted
             
         except Exception as e:
             print(f"⚠️ Error clearing cache: {e}")
             return 0
     
+    def _count_keys(self, pattern: str) -> int:
+        """Count keys matching pattern without blocking Redis"""
+        return sum(1 for _ in self.redis_client.scan_iter(match=pattern, count=_SCAN_BATCH))
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         if not self.enabled or not self.redis_client:
@@ -199,8 +271,8 @@ class VectorCacheManager:
         
         try:
             info = self.redis_client.info()
-            vector_keys = len(self.redis_client.keys("savin_ai:vectors:*"))
-            search_keys = len(self.redis_client.keys("savin_ai:search:*"))
+            vector_keys = self._count_keys("savin_ai:vectors:*")
+            search_keys = self._count_keys("savin_ai:search:*")
             
             return {
                 "status": "active",
@@ -214,13 +286,10 @@ class VectorCacheManager:
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
-# Global cache manager instance
-cache_manager = VectorCacheManager()
-
 @st.cache_resource
 def get_cache_manager():
-    """Get cached instance of VectorCacheManager"""
-    return cache_manager
+    """Get the process-wide VectorCacheManager (created on first use, not at import)"""
+    return VectorCacheManager()
 
 # Enhanced vector store creation with caching
 def get_cached_vector_store(document_text: str, chunks: List[str]):
@@ -235,29 +304,35 @@ def get_cached_vector_store(document_text: str, chunks: List[str]):
     
     # Create new vector store
     st.info("🔄 Creating new vector store...")
-    from utils import get_vector_store
+    from utils import get_chunk_metadata, get_vector_store
     
-    vector_store = get_vector_store(chunks)
+    metadata = get_chunk_metadata(chunks)
+    vector_store = get_vector_store(chunks, metadata)
     
     # Cache for future use
-    metadata = [{"chunk_id": i, "length": len(chunk)} for i, chunk in enumerate(chunks)]
     cache_mgr.cache_vector_store(document_text, vector_store, chunks, metadata)
     
     return vector_store
 
+@st.cache_resource
+def get_web_search_manager():
+    """Get the process-wide WebSearchManager (one DDGS client and worker pool)"""
+    from web_search import WebSearchManager
+    return WebSearchManager(on_error=st.error)
+
 # Enhanced web search with caching
 def get_cached_web_search(query: str, search_type: str = "combined"):
     """Get cached web search results"""
+    from web_search import SearchHit, to_dict
     cache_mgr = get_cache_manager()
     
-    # Try cache first
+    # Try cache first (stored as dicts, handed back as SearchHits)
     cached_results = cache_mgr.get_cached_search_results(query, search_type)
     if cached_results:
-        return cached_results
+        return [SearchHit(**result) for result in cached_results]
     
     # Perform new search
-    from web_search import WebSearchManager
-    web_search = WebSearchManager()
+    web_search = get_web_search_manager()
     
     if search_type == "wikipedia":
         results = web_search.search_wikipedia(query)
@@ -267,6 +342,6 @@ def get_cached_web_search(query: str, search_type: str = "combined"):
         results = web_search.combined_search(query)
     
     # Cache results
-    cache_mgr.cache_search_results(query, search_type, results)
+    cache_mgr.cache_search_results(query, search_type, [to_dict(hit) for hit in results])
     
     return results
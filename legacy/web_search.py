@@ -2,132 +2,280 @@
 Web search utilities for SAVIN AI
 Integrates Wikipedia and DuckDuckGo search functionality
 """
-import wikipedia
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
+from cachetools import TTLCache, cached
+import requests
+from requests.adapters import HTTPAdapter
 from ddgs import DDGS
 from langchain.tools import Tool
 from langchain.schema import Document
-import streamlit as st
-from typing import List, Dict, Any
+from typing import IO, Callable, List, Dict, Final, Literal, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_NO_RESULTS = "No search results found."
+_CONTEXT_HEADER = "Web search results:\n\n"
+_FMT = "**%d. %s 🌟**\n• **Source:** %s 📚\n• **Summary:** %s\n• **Link:** [Visit here 🔗](%s)\n\n"
+_CONTEXT_ENTRY = "Title: %s\nSource: %s\nContent: %s\n\n"
+
+# Repeated queries (agent loops, reruns) are answered from memory; web results go stale sooner
+_WIKI_CACHE = TTLCache(maxsize=512, ttl=3600)
+_DDG_CACHE = TTLCache(maxsize=512, ttl=600)
+_CACHE_LOCK = RLock()
+
+# One keep-alive connection pool for MediaWiki instead of a new TCP+TLS handshake per request
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_HTTP.headers["User-Agent"] = "SAVIN-AI/1.0 (https://github.com/savinpadencherry/SavAchuNotebook)"
+
+_WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
+_MAX_QUERY_CHARS = 500
+# Seconds: per-source deadline, then the overall budget for a combined search
+_SOURCE_TIMEOUT = 3.0
+_COMBINED_TIMEOUT = 5.0
+_MAX_RESULTS = 10
+
+class SearchHit(NamedTuple):
+    """One search result; a tuple is a third the size of the equivalent dict"""
+    title: str
+    url: str
+    summary: str
+    source: str
+
+def to_dict(hit: SearchHit) -> Dict[str, str]:
+    """Plain dict form of a result, for callers (and caches) that expect dicts"""
+    return hit._asdict()
+
+def _normalize_query(query: str) -> str:
+    """Trim whitespace and overlong input so equivalent queries share a cache slot"""
+    return query.strip()[:_MAX_QUERY_CHARS]
+
+def _clamp_results(max_results: int) -> int:
+    return min(max(max_results, 1), _MAX_RESULTS)
+
+def _mark_started(started: asyncio.Future) -> None:
+    if not started.done():
+        started.set_result(None)
+
+def _search_key(manager, query: str, max_results: int):
+    """Cache key shared by every WebSearchManager instance"""
+    return (query, max_results)
 
 class WebSearchManager:
-    def __init__(self):
-        self.ddgs = DDGS()
+    def __init__(self, on_error: Optional[Callable[[str], None]] = None):
+        # Client timeouts match the per-source deadline, so an abandoned job frees its worker
+        self.ddgs = DDGS(timeout=_SOURCE_TIMEOUT)
+        # Where search failures are reported; the Streamlit app passes st.error
+        self._on_error = on_error or logger.error
+        # Shared worker threads for the blocking search clients
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-search")
+    
+    def close(self):
+        """Stop the worker threads (the pooled HTTP session is shared and stays open)"""
+        self._pool.shutdown(wait=False)
+    
+    def __enter__(self):
+        return self
     
-    def search_wikipedia(self, query: str, max_results: int = 3) -> List[Dict[str, Any]]:
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def search_wikipedia(self, query: str, max_results: int = 3) -> List[SearchHit]:
         """Search Wikipedia for relevant articles"""
+        query = _normalize_query(query)
+        if not query:
+            return []
         try:
-            # Search for pages
-            search_results = wikipedia.search(query, results=max_results)
-            results = []
-            
-            for title in search_results[:max_results]:
-                try:
-                    page = wikipedia.page(title)
-                    # Get summary (first 500 chars)
-                    summary = page.summary[:500] + "..." if len(page.summary) > 500 else page.summary
-                    
-                    results.append({
-                        "title": page.title,
-                        "url": page.url,
-                        "summary": summary,
-                        "source": "Wikipedia"
-                    })
-                except wikipedia.exceptions.DisambiguationError as e:
-                    # Handle disambiguation by taking the first option
-                    try:
-                        page = wikipedia.page(e.options[0])
-                        summary = page.summary[:500] + "..." if len(page.summary) > 500 else page.summary
-                        results.append({
-                            "title": page.title,
-                            "url": page.url,
-                            "summary": summary,
-                            "source": "Wikipedia"
-                        })
-                    except:
-                        continue
-                except:
-                    continue
-            
-            return results
-            
+            return list(self._fetch_wikipedia(query, _clamp_results(max_results)))
         except Exception as e:
-            st.error(f"Wikipedia search error: {str(e)}")
+            self._on_error(f"Wikipedia search error: {str(e)}")
             return []
     
-    def search_duckduckgo(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+    @cached(_WIKI_CACHE, key=_search_key, lock=_CACHE_LOCK)
+    def _fetch_wikipedia(self, query: str, max_results: int) -> Tuple[SearchHit, ...]:
+        """Query Wikipedia; errors from the request propagate (and are not cached)"""
+        # Search, URLs and plain-text intro extracts in a single MediaWiki round trip
+        response = _HTTP.get(_WIKI_API_URL, params={
+            "action": "query",
+            "format": "json",
+            "generator": "search",
+            "gsrsearch": query,
+            "gsrlimit": max_results,
+            "prop": "extracts|info",
+            "inprop": "url",
+            "exintro": 1,
+            "explaintext": 1,
+            "exchars": 500,
+            "exlimit": max_results,
+            "redirects": 1
+        }, timeout=_SOURCE_TIMEOUT)
+        response.raise_for_status()
+        
+        # Pages come back keyed by page id; "index" is the search rank
+        pages = response.json().get("query", {}).get("pages", {})
+        return tuple(
+            SearchHit(page["title"], page["fullurl"], page.get("extract", ""), "Wikipedia")
+            for page in sorted(pages.values(), key=lambda page: page.get("index", 0))
+        )
+    
+    def search_duckduckgo(self, query: str, max_results: int = 5) -> List[SearchHit]:
         """Search DuckDuckGo for web results"""
+        query = _normalize_query(query)
+        if not query:
+            return []
         try:
-            results = []
-            search_results = self.ddgs.text(query, max_results=max_results)
-            
-            for result in search_results:
-                results.append({
-                    "title": result.get("title", ""),
-                    "url": result.get("href", ""),
-                    "summary": result.get("body", ""),
-                    "source": "DuckDuckGo"
-                })
-            
-            return results
-            
+            return list(self._fetch_duckduckgo(query, _clamp_results(max_results)))
         except Exception as e:
-            st.error(f"DuckDuckGo search error: {str(e)}")
+            self._on_error(f"DuckDuckGo search error: {str(e)}")
             return []
     
-    def combined_search(self, query: str, include_wikipedia: bool = True, include_web: bool = True) -> List[Dict[str, Any]]:
-        """Perform combined search across Wikipedia and DuckDuckGo"""
-        all_results = []
+    @cached(_DDG_CACHE, key=_search_key, lock=_CACHE_LOCK)
+    def _fetch_duckduckgo(self, query: str, max_results: int) -> Tuple[SearchHit, ...]:
+        """Query DuckDuckGo; errors propagate (and are not cached)"""
+        results = []
+        search_results = self.ddgs.text(query, max_results=max_results)
         
-        if include_wikipedia:
-            wiki_results = self.search_wikipedia(query, max_results=2)
-            all_results.extend(wiki_results)
+        for result in search_results:
+            results.append(SearchHit(
+                result.get("title", ""), result.get("href", ""), result.get("body", ""), "DuckDuckGo"
+            ))
         
+        return tuple(results)
+    
+    async def combined_search_async(self, query: str, include_wikipedia: bool = True, include_web: bool = True) -> List[SearchHit]:
+        """Search Wikipedia and DuckDuckGo concurrently; latency is the slower of the two"""
+        return await self._combined_search(query, include_wikipedia, include_web, batched=False)
+    
+    async def _combined_search(self, query: str, include_wikipedia: bool, include_web: bool, batched: bool) -> List[SearchHit]:
+        """Combined search; in a batch, the deadlines start when the query's jobs reach a worker"""
+        query = _normalize_query(query)
+        if not query:
+            return []
+        loop = asyncio.get_running_loop()
+        sources = []
+        if include_wikipedia:
+            sources.append(("Wikipedia", self._fetch_wikipedia, 2))
         if include_web:
-            web_results = self.search_duckduckgo(query, max_results=3)
-            all_results.extend(web_results)
+            sources.append(("DuckDuckGo", self._fetch_duckduckgo, 3))
+        if not sources:
+            return []  # asyncio.wait rejects an empty task set
+        
+        # A slow source costs at most its own deadline; whatever arrived in time is returned
+        starts = [loop.create_future() if batched else None for _ in sources]
+        tasks = [
+            asyncio.ensure_future(self._run_source(fetch, query, max_results, started))
+            for (_, fetch, max_results), started in zip(sources, starts)
+        ]
+        if batched:
+            # Time queued behind the batch's other queries doesn't count against the budget
+            await asyncio.wait(starts + tasks, return_when=asyncio.FIRST_COMPLETED)
+        _, pending = await asyncio.wait(tasks, timeout=_COMBINED_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        
+        all_results = []
+        for (source, _, _), task in zip(sources, tasks):
+            if task in pending or isinstance(task.exception(), asyncio.TimeoutError):
+                # Partial results are expected here, so log rather than alarm the user.
+                # The worker thread can't be interrupted; it finishes and still fills the cache.
+                logger.warning("%s search timed out for %r", source, query)
+                continue
+            if task.exception() is not None:
+                # Reported here, on the calling thread, where a UI callback can render it
+                self._on_error(f"{source} search error: {str(task.exception())}")
+                continue
+            all_results.extend(task.result())
         
         return all_results
     
-    def format_search_results(self, results: List[Dict[str, Any]]) -> str:
-        """Format search results for display with friendly emojis and bullet points"""
-        if not results:
-            return "No search results found."
-        
-        formatted = ""
+    async def _run_source(self, fetch, query: str, max_results: int, started: Optional[asyncio.Future]) -> Tuple[SearchHit, ...]:
+        """Run one source on the pool; with `started`, its deadline begins when a worker picks the job up"""
+        loop = asyncio.get_running_loop()
         
-        for i, result in enumerate(results, 1):
-            formatted += f"**{i}. {result['title']} 🌟**\n"
-            formatted += f"• **Source:** {result['source']} 📚\n"
-            formatted += f"• **Summary:** {result['summary']}\n"
-            formatted += f"• **Link:** [Visit here 🔗]({result['url']})\n\n"
+        def job():
+            if started is not None:
+                try:
+                    loop.call_soon_threadsafe(_mark_started, started)
+                except RuntimeError:
+                    pass  # The search was abandoned and its loop closed; still fill the cache
+            return fetch(query, max_results)
         
-        return formatted
+        future = loop.run_in_executor(self._pool, job)
+        if started is not None:
+            try:
+                # The job's own future is watched too, in case it fails before signalling
+                await asyncio.wait((started, future), return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                future.cancel()  # Drops the job if no worker has picked it up yet
+                raise
+        # On timeout the future is cancelled, which also drops a job still waiting for a worker
+        return await asyncio.wait_for(future, _SOURCE_TIMEOUT)
+    
+    async def combined_search_many_async(self, queries: List[str]) -> List[List[SearchHit]]:
+        """Run combined searches for several queries at once; results are in query order"""
+        # Source errors are reported inside _combined_search, so one bad query can't sink the batch
+        return list(await asyncio.gather(*(self._combined_search(query, True, True, batched=True) for query in queries)))
+    
+    def combined_search_many(self, queries: List[str]) -> List[List[SearchHit]]:
+        """Batched combined search (sync entry point)"""
+        return asyncio.run(self.combined_search_many_async(queries))
     
-    def create_search_context(self, results: List[Dict[str, Any]]) -> str:
-        """Create context string for AI processing"""
-        if not results:
-            return ""
+    def combined_search(self, query: str, include_wikipedia: bool = True, include_web: bool = True) -> List[SearchHit]:
+        """Perform combined search across Wikipedia and DuckDuckGo (sync entry point)"""
+        if not query.strip():
+            return []  # Nothing to search; skip starting an event loop
+        return asyncio.run(self.combined_search_async(query, include_wikipedia, include_web))
+    
+    def render(self, results: List[SearchHit], mode: Literal["display", "context", "both"] = "display") -> Union[str, Tuple[str, str]]:
+        """Render results for display, as AI context, or both in a single pass"""
+        want_display = mode in ("display", "both")
+        want_context = mode in ("context", "both")
+        display_parts = []
+        context_parts = [_CONTEXT_HEADER]
         
-        context = "Web search results:\n\n"
-        for result in results:
-            context += f"Title: {result['title']}\n"
-            context += f"Source: {result['source']}\n"
-            context += f"Content: {result['summary']}\n\n"
+        for i, hit in enumerate(results, 1):
+            title, source, summary = hit.title, hit.source, hit.summary
+            if want_display:
+                display_parts.append(_FMT % (i, title, source, summary, hit.url))
+            if want_context:
+                context_parts.append(_CONTEXT_ENTRY % (title, source, summary))
         
-        return context
+        display = "".join(display_parts) if results else _NO_RESULTS
+        context = "".join(context_parts) if results else ""
+        if mode == "both":
+            return display, context
+        return context if want_context else display
+    
+    def format_search_results(self, results: List[SearchHit]) -> str:
+        """Format search results for display with friendly emojis and bullet points"""
+        return self.render(results, "display")
+    
+    def create_search_context(self, results: List[SearchHit], out: Optional[IO[str]] = None) -> Optional[str]:
+        """Create context string for AI processing; with `out`, write it there and return None"""
+        if out is None:
+            return self.render(results, "context")
+        # Stream straight into the caller's prompt buffer instead of building a string first
+        if results:
+            out.write(_CONTEXT_HEADER)
+            for hit in results:
+                out.write(_CONTEXT_ENTRY % (hit.title, hit.source, hit.summary))
+        return None
 
 # Clean, focused prompt suggestions
-SUGGESTED_PROMPTS = [
-    "� Summarize this document",
-    "� Explain key concepts", 
-    "� Answer my questions"
-]
+SUGGESTED_PROMPTS: Final[Tuple[str, ...]] = (
+    "📝 Summarize this document",
+    "💡 Explain key concepts",
+    "❓ Answer my questions"
+)
 
 def get_web_search_tool(web_search_manager: WebSearchManager):
     """Create a LangChain tool for web search"""
-    def search_web(query: str) -> str:
-        results = web_search_manager.combined_search(query)
-        return web_search_manager.create_search_context(results)
+    # Bound methods as default arguments: fast local lookups on every tool call
+    def search_web(query: str, _search=web_search_manager.combined_search, _render=web_search_manager.render) -> str:
+        return _render(_search(query), "context")
     
     return Tool(
         name="web_search",
@@ -40,7 +40,7 @@ logger = logging.getLogger(__name__)
 
 # Import organized modules
 from src.config.settings import AppConfig
-from src.ui.styles.theme import get_complete_css
+from src.ui.styles.theme import get_complete_css, get_font_links
 from src.ui.app_controller import create_application_controller
 from src.ui.message_handlers import create_message_handlers
 from src.utils.performance import (
@@ -114,7 +114,8 @@ class SavinAIApp:
         
         logger.info("📱 Streamlit page configuration set")
         
-        # Load CSS styles for enhanced UI appearance
+        # Load the font stylesheet and CSS styles for enhanced UI appearance
+        st.markdown(get_font_links(), unsafe_allow_html=True)
         st.markdown(get_complete_css(), unsafe_allow_html=True)
         logger.info("🎨 CSS styles loaded")
     
@@ -13,7 +13,7 @@ from langchain.chains import RetrievalQA
 from langchain.schema import Document
 from src.config.settings import AIConfig
 from .exceptions import AIProcessingError
-from ..utils.performance import get_cached_llm_model
+from ..utils.performance import get_llm_model
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ class AIHandler:
 
     def _get_cached_llm(self) -> Ollama:
         try:
-            cached_llm = get_cached_llm_model()
+            cached_llm = get_llm_model()
             logger.info(f"✅ Using cached LLM with model: {self.config.AI_MODEL}")
             return cached_llm
         except Exception as e:
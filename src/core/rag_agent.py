@@ -25,7 +25,7 @@ except ImportError:
 
 from src.config.settings import AIConfig
 from .exceptions import AIProcessingError
-from ..utils.performance import get_cached_llm_model
+from ..utils.performance import get_llm_model
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +49,7 @@ class EnhancedRAGAgent:
         
         # Initialize LLM with caching if available
         try:
-            self.llm = get_cached_llm_model()
+            self.llm = get_llm_model()
         except Exception as e:
             logger.warning(f"Failed to initialize LLM: {e}")
             self.llm = None
@@ -13,7 +13,7 @@ from langchain_community.vectorstores import Chroma
 
 from ..config.settings import AIConfig
 from .exceptions import VectorStoreError
-from ..utils.performance import get_cached_embeddings_model
+from ..utils.performance import get_embeddings_model
 from .ollama_embeddings import OllamaEmbeddingsLocal
 
 
@@ -35,7 +35,7 @@ class VectorStoreManager:
         """Get cached embeddings model for better performance"""
         try:
             # Use cached embeddings model
-            cached_embeddings = get_cached_embeddings_model()
+            cached_embeddings = get_embeddings_model()
             logger.info("Using cached embeddings model")
             return cached_embeddings
         except Exception as e:
@@ -3,96 +3,173 @@ UI styling and CSS management for SAVIN AI application.
 Provides centralized styling functions and CSS generation.
 """
 
+import re
+
 from src.config.settings import UIConfig
 
 
-def get_base_styles() -> str:
-    """Get base CSS styles for the application"""
-    config = UIConfig()
-    
-    return f"""
-    /* Import modern font */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
+# Config values are emitted once as custom properties on :root and referenced
+# through var(...) in the rules below, so each value appears only once in the
+# stylesheet and the theme can be changed at runtime without regenerating CSS.
+_ROOT_VARS = """
+    :root {
+        --primary: %s;
+        --secondary: %s;
+        --accent: %s;
+        --error: %s;
+        --success: %s;
+        --gradient-duration: %s;
+        --slide-duration: %s;
+        --content-width: %dpx;
+        --sidebar-width: %dpx;
+        --chat-height: %dpx;
+    }
+    """ % (
+    UIConfig.PRIMARY_COLOR,
+    UIConfig.SECONDARY_COLOR,
+    UIConfig.ACCENT_COLOR,
+    UIConfig.ERROR_COLOR,
+    UIConfig.SUCCESS_COLOR,
+    UIConfig.GRADIENT_ANIMATION_DURATION,
+    UIConfig.SLIDE_ANIMATION_DURATION,
+    UIConfig.MAX_CONTENT_WIDTH,
+    UIConfig.SIDEBAR_WIDTH,
+    UIConfig.MAX_CHAT_HEIGHT,
+)
+
+# Vendor-prefixed properties still needed by the last two Chrome, Safari and
+# Firefox releases. Every other prefixed declaration has an unprefixed
+# counterpart in the same rule and is dropped by _strip_vendor_prefixes().
+_REQUIRED_PREFIXED = frozenset({
+    "-webkit-background-clip",
+    "-webkit-text-fill-color",
+})
+
+_PREFIXED_DECLARATION = re.compile(r"^[ \t]*(-(?:webkit|moz|ms|o)-[\w-]+)[ \t]*:[^;]*;[ \t]*\n", re.MULTILINE)
+
+
+def _strip_vendor_prefixes(css: str) -> str:
+    """Remove vendor-prefixed declarations that are not in the allowlist"""
+    return _PREFIXED_DECLARATION.sub(
+        lambda m: m.group(0) if m.group(1) in _REQUIRED_PREFIXED else "", css
+    )
+
+
+# Comments, whitespace around block/declaration delimiters and any other
+# whitespace run are matched by one alternation so the stylesheet is
+# minified in a single scan.
+_MINIFY_PATTERN = re.compile(r"/\*.*?\*/|\s*([{};])\s*|\s+", re.DOTALL)
+
+
+def _minify_replacement(match: "re.Match[str]") -> str:
+    if match.group(1):
+        return match.group(1)
+    return "" if match.group(0).startswith("/*") else " "
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace in a stylesheet"""
+    return _MINIFY_PATTERN.sub(_minify_replacement, css).strip()
+
+
+# The Inter font stylesheet is linked from the page rather than pulled in with
+# a CSS @import, so the browser can fetch it in parallel with the app instead
+# of waiting until this stylesheet has been parsed.
+_FONT_LINKS = (
+    '<link rel="preconnect" href="https://fonts.googleapis.com">'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+    '<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap">'
+)
+
+
+def get_font_links() -> str:
+    """Get the HTML link tags that load the application font"""
+    return _FONT_LINKS
+
+
+_BASE_STYLES = """
     /* Base styling */
-    html, body, [class*="css"] {{
+    html, body, [class*="css"] {
         font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }}
+    }
     
     /* Hide Streamlit elements */
-    #MainMenu {{visibility: hidden;}}
-    .stDeployButton {{display:none;}}
-    footer {{visibility: hidden;}}
-    .stAppHeader {{display: none;}}
+    #MainMenu {visibility: hidden;}
+    .stDeployButton {display:none;}
+    footer {visibility: hidden;}
+    .stAppHeader {display: none;}
     
     /* Modern gradient background */
-    .stApp {{
+    .stApp {
         background: linear-gradient(135deg, 
-            {config.PRIMARY_COLOR} 0%, 
-            {config.SECONDARY_COLOR} 25%, 
-            {config.ACCENT_COLOR} 50%, 
-            {config.ERROR_COLOR} 75%, 
-            {config.SUCCESS_COLOR} 100%
+            var(--primary) 0%, 
+            var(--secondary) 25%, 
+            var(--accent) 50%, 
+            var(--error) 75%, 
+            var(--success) 100%
         );
         background-size: 300% 300%;
-        animation: gradientShift {config.GRADIENT_ANIMATION_DURATION} ease infinite;
-    }}
-    
-    @keyframes gradientShift {{
-        0% {{ background-position: 0% 50%; }}
-        50% {{ background-position: 100% 50%; }}
-        100% {{ background-position: 0% 50%; }}
-    }}
+        animation: gradientShift var(--gradient-duration) ease infinite;
+    }
+    
+    @keyframes gradientShift {
+        0% { background-position: 0% 50%; }
+        50% { background-position: 100% 50%; }
+        100% { background-position: 0% 50%; }
+    }
     """
 
 
-def get_animation_styles() -> str:
-    """Get animation-related CSS styles"""
-    config = UIConfig()
-    
-    return f"""
+def get_base_styles() -> str:
+    """Get base CSS styles for the application"""
+    return _BASE_STYLES
+
+
+_ANIMATION_STYLES = """
     /* Landing page animations */
-    @keyframes slideInUp {{
-        from {{
+    @keyframes slideInUp {
+        from {
             opacity: 0;
             transform: translateY(30px);
-        }}
-        to {{
+        }
+        to {
             opacity: 1;
             transform: translateY(0);
-        }}
-    }}
+        }
+    }
     
-    @keyframes brain-pulse {{
-        0%, 100% {{ transform: scale(1); }}
-        50% {{ transform: scale(1.1); }}
-    }}
+    @keyframes brain-pulse {
+        0%, 100% { transform: scale(1); }
+        50% { transform: scale(1.1); }
+    }
     
-    @keyframes aurora {{
-        0% {{ background-position: 0% 50%; }}
-        50% {{ background-position: 100% 50%; }}
-        100% {{ background-position: 0% 50%; }}
-    }}
+    @keyframes aurora {
+        0% { background-position: 0% 50%; }
+        50% { background-position: 100% 50%; }
+        100% { background-position: 0% 50%; }
+    }
     
     /* Thinking animation */
-    .thinking-container {{
+    .thinking-container {
         background: linear-gradient(135deg, rgba(102, 126, 234, 0.08) 0%, rgba(118, 75, 162, 0.08) 100%);
         border: 1px solid rgba(102, 126, 234, 0.2);
         border-radius: 12px;
         padding: 1.5rem;
         margin: 1rem 0;
-    }}
+    }
     
-    .thinking-icon {{
+    .thinking-icon {
         display: inline-block;
         font-size: 1.5rem;
         animation: brain-pulse 2.5s ease-in-out infinite;
         margin-right: 0.75rem;
-    }}
+        will-change: transform;
+        contain: paint;
+    }
     
     /* Feature card animations */
-    .feature-card {{
-        background: rgba(255,255,255,0.05);
+    .feature-card {
+        background: rgba(255,255,255,0.08);
         border-radius: 15px;
         padding: 2rem 1.5rem;
         text-align: center;
@@ -100,34 +177,36 @@ def get_animation_styles() -> str:
         display: flex;
         flex-direction: column;
         justify-content: space-between;
-        backdrop-filter: blur(10px);
         border: 1px solid rgba(255,255,255,0.1);
         transition: all 0.3s ease;
-        animation: slideInUp {config.SLIDE_ANIMATION_DURATION} ease;
+        animation: slideInUp var(--slide-duration) ease;
         margin: 1rem 0;
-    }}
+        will-change: transform;
+        contain: paint;
+    }
     
-    .feature-card:hover {{
+    .feature-card:hover {
         transform: translateY(-5px);
-        background: rgba(255,255,255,0.08);
+        background: rgba(255,255,255,0.12);
         box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-    }}
+    }
     
-    .feature-card:nth-child(1) {{ animation-delay: 0.1s; }}
-    .feature-card:nth-child(2) {{ animation-delay: 0.2s; }}
-    .feature-card:nth-child(3) {{ animation-delay: 0.3s; }}
+    .feature-card:nth-child(1) { animation-delay: 0.1s; }
+    .feature-card:nth-child(2) { animation-delay: 0.2s; }
+    .feature-card:nth-child(3) { animation-delay: 0.3s; }
     """
 
 
-def get_layout_styles() -> str:
-    """Get layout-related CSS styles"""
-    config = UIConfig()
-    
-    return f"""
+def get_animation_styles() -> str:
+    """Get animation-related CSS styles"""
+    return _ANIMATION_STYLES
+
+
+_LAYOUT_STYLES = """
     /* Main content container */
-    .main .block-container {{
+    .main .block-container {
         padding: 2rem 1rem;
-        max-width: {config.MAX_CONTENT_WIDTH}px;
+        max-width: var(--content-width);
         background: rgba(255, 255, 255, 0.05);
         backdrop-filter: blur(20px);
         border-radius: 20px;
@@ -135,55 +214,58 @@ def get_layout_styles() -> str:
         box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
         border: 1px solid rgba(255, 255, 255, 0.1);
         padding-bottom: 180px !important;
-    }}
+    }
     
     /* Sidebar styling */
-    .css-1d391kg {{
+    .css-1d391kg {
         background: rgba(15, 15, 35, 0.95);
         backdrop-filter: blur(25px);
         border-right: 1px solid rgba(255, 255, 255, 0.1);
-        width: {config.SIDEBAR_WIDTH}px;
-    }}
+        width: var(--sidebar-width);
+    }
     
     /* Sidebar header */
-    .sidebar-header {{
+    .sidebar-header {
         text-align: center;
         padding: 1rem;
         border-bottom: 1px solid rgba(255, 255, 255, 0.1);
         margin-bottom: 1rem;
-    }}
+    }
     
-    .sidebar-title {{
+    .sidebar-title {
         font-size: 1.5rem;
         font-weight: 600;
         color: rgba(255, 255, 255, 0.9);
         margin: 0;
-        background: linear-gradient(135deg, {config.PRIMARY_COLOR}, {config.SECONDARY_COLOR});
+        background: linear-gradient(135deg, var(--primary), var(--secondary));
         -webkit-background-clip: text;
         -webkit-text-fill-color: transparent;
-    }}
+    }
     
-    .sidebar-subtitle {{
+    .sidebar-subtitle {
         font-size: 0.8rem;
         color: rgba(255, 255, 255, 0.6);
         margin: 0.5rem 0 0 0;
         font-weight: 300;
-    }}
+    }
     
     /* Chat container */
-    .chat-container {{
-        height: {config.MAX_CHAT_HEIGHT}px;
+    .chat-container {
+        height: var(--chat-height);
         overflow-y: auto;
         border-radius: 12px;
         background: rgba(255, 255, 255, 0.02);
         border: 1px solid rgba(255, 255, 255, 0.1);
-    }}
+    }
     """
 
 
-def get_input_styles() -> str:
-    """Get input and form-related CSS styles - Enhanced unified navbar design"""
-    return """
+def get_layout_styles() -> str:
+    """Get layout-related CSS styles"""
+    return _LAYOUT_STYLES
+
+
+_INPUT_STYLES = """
     /* Fixed Bottom Navigation Container - Premium Floating Design */
     .bottom-navbar-container {
         position: fixed !important;
@@ -224,6 +306,7 @@ def get_input_styles() -> str:
         ) !important;
         z-index: -1 !important;
         animation: borderGlow 3s ease-in-out infinite alternate !important;
+        will-change: opacity !important;
     }
     
     @keyframes borderGlow {
@@ -322,7 +405,7 @@ def get_input_styles() -> str:
             rgba(79, 172, 254, 0.6) 100%
         ) !important;
         mask: linear-gradient(#fff 0 0) content-box, linear-gradient(#fff 0 0) !important;
-        mask-composite: xor !important;
+        mask-composite: exclude !important;
         -webkit-mask: linear-gradient(#fff 0 0) content-box, linear-gradient(#fff 0 0) !important;
         -webkit-mask-composite: xor !important;
         opacity: 0 !important;
@@ -400,7 +483,7 @@ def get_input_styles() -> str:
 
     /* Premium primary send button - ChatGPT inspired */
     .bottom-navbar-container .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%) !important;
+        background: linear-gradient(135deg, var(--primary) 0%, var(--secondary) 50%, var(--accent) 100%) !important;
         border: 2px solid rgba(102, 126, 234, 0.4) !important;
         color: white !important;
         font-weight: 700 !important;
@@ -486,9 +569,12 @@ def get_input_styles() -> str:
     """
 
 
-def get_button_styles() -> str:
-    """Get button-related CSS styles"""
-    return """
+def get_input_styles() -> str:
+    """Get input and form-related CSS styles - Enhanced unified navbar design"""
+    return _INPUT_STYLES
+
+
+_BUTTON_STYLES = """
     /* Secondary buttons integrated in navbar */
     .stButton button[kind="secondary"] {
         background: rgba(255, 255, 255, 0.12) !important;
@@ -515,7 +601,7 @@ def get_button_styles() -> str:
     
     /* Primary send button in navbar */
     .stButton button[kind="primary"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
+        background: linear-gradient(135deg, var(--primary) 0%, var(--secondary) 100%) !important;
         border: none !important;
         border-radius: 18px !important;
         color: white !important;
@@ -530,7 +616,7 @@ def get_button_styles() -> str:
     }
     
     .stButton button[kind="primary"]:hover {
-        background: linear-gradient(135deg, #764ba2 0%, #667eea 100%) !important;
+        background: linear-gradient(135deg, var(--secondary) 0%, var(--primary) 100%) !important;
         transform: scale(1.02) !important;
         box-shadow: 0 8px 25px rgba(102, 126, 234, 0.5) !important;
     }
@@ -546,15 +632,18 @@ def get_button_styles() -> str:
     """
 
 
-def get_welcome_screen_styles() -> str:
-    """Get welcome screen specific styles"""
-    return """
+def get_button_styles() -> str:
+    """Get button-related CSS styles"""
+    return _BUTTON_STYLES
+
+
+_WELCOME_SCREEN_STYLES = """
     /* Welcome screen styling */
     .welcome-title {
         font-size: 2.5rem;
         font-weight: 300;
         margin: 0;
-        background: linear-gradient(135deg, rgba(255, 255, 255, 0.9), #667eea);
+        background: linear-gradient(135deg, rgba(255, 255, 255, 0.9), var(--primary));
         -webkit-background-clip: text;
         -webkit-text-fill-color: transparent;
         text-align: center;
@@ -587,9 +676,12 @@ def get_welcome_screen_styles() -> str:
     """
 
 
-def get_search_styles() -> str:
-    """Get search-related CSS styles"""
-    return """
+def get_welcome_screen_styles() -> str:
+    """Get welcome screen specific styles"""
+    return _WELCOME_SCREEN_STYLES
+
+
+_SEARCH_STYLES = """
     /* Search icons styling */
     .search-icon-btn {
         padding: 0.5rem;
@@ -626,19 +718,32 @@ def get_search_styles() -> str:
     """
 
 
+def get_search_styles() -> str:
+    """Get search-related CSS styles"""
+    return _SEARCH_STYLES
+
+
+# Assembled once at import: the parts are static, so every call returns the
+# same prebuilt string.
+_STYLE_PARTS = (
+    _BASE_STYLES,
+    _ROOT_VARS,
+    _ANIMATION_STYLES,
+    _LAYOUT_STYLES,
+    _INPUT_STYLES,
+    _BUTTON_STYLES,
+    _WELCOME_SCREEN_STYLES,
+    _SEARCH_STYLES,
+)
+
+_COMPLETE_CSS = _minify_css(
+    _strip_vendor_prefixes("<style>\n" + "\n".join(_STYLE_PARTS) + "\n</style>")
+)
+
+
 def get_complete_css() -> str:
     """Get complete CSS styling for the application"""
-    return f"""
-    <style>
-    {get_base_styles()}
-    {get_animation_styles()}
-    {get_layout_styles()}
-    {get_input_styles()}
-    {get_button_styles()}
-    {get_welcome_screen_styles()}
-    {get_search_styles()}
-    </style>
-    """
+    return _COMPLETE_CSS
 
 
 def get_glassmorphism_card(content: str, padding: str = "2rem", border_radius: str = "15px") -> str:
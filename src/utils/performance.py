@@ -4,14 +4,25 @@ Provides caching, lazy loading, and performance monitoring.
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 import logging
+import collections
+import copy
 import functools
+import hashlib
+import pickle
+import threading
 import time
 from typing import Any, Callable, Dict, Optional, List
 from contextlib import contextmanager
 
+from cachetools import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Same fields as functools' cache statistics, summed over both cache tiers
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
 
 class PerformanceCache:
     """Singleton cache for expensive operations"""
@@ -26,15 +37,19 @@ class PerformanceCache:
     
     def __init__(self):
         if not self._initialized:
-            self._cache = {}
+            # Functions decorated with cache_expensive_operation; each owns its caches
+            self._cached_functions = []
             self._embeddings_model = None
             self._llm_model = None
+            self._model_lock = threading.Lock()
             self._initialized = True
     
     def get_embeddings_model(self):
         """Get cached embeddings model"""
-        if self._embeddings_model is None:
-            with performance_timer("Loading embeddings model"):
+        if self._embeddings_model is not None:
+            return self._embeddings_model
+        with self._model_lock, performance_timer("Loading embeddings model"):
+            if self._embeddings_model is None:
                 import warnings
                 warnings.filterwarnings('ignore', category=FutureWarning)
                 warnings.filterwarnings('ignore', message='.*deprecated.*')
@@ -48,8 +63,10 @@ class PerformanceCache:
     
     def get_llm_model(self):
         """Get cached LLM model"""
-        if self._llm_model is None:
-            with performance_timer("Loading LLM model"):
+        if self._llm_model is not None:
+            return self._llm_model
+        with self._model_lock, performance_timer("Loading LLM model"):
+            if self._llm_model is None:
                 import warnings
                 warnings.filterwarnings('ignore', category=FutureWarning)
                 warnings.filterwarnings('ignore', message='.*deprecated.*')
@@ -65,23 +82,58 @@ class PerformanceCache:
                 logger.info(f"LLM model {AIConfig.AI_MODEL} loaded and cached")
         return self._llm_model
     
-    def cache_result(self, key: str, result: Any):
-        """Cache a result with the given key"""
-        self._cache[key] = result
+    def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """
+        Embed many texts with the cached embeddings model.
+        
+        Texts are sent through embed_documents in batches of ``batch_size``
+        rather than one embed_query call per text.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Number of texts per embed_documents call
+            
+        Returns:
+            One embedding vector per input text, in input order
+        """
+        model = self.get_embeddings_model()
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            embeddings.extend(model.embed_documents(texts[start:start + batch_size]))
+        return embeddings
     
-    def get_cached_result(self, key: str) -> Optional[Any]:
-        """Get cached result by key"""
-        return self._cache.get(key)
+    def register(self, cached_function: Callable):
+        """Track a cache_expensive_operation function for stats() and clear_cache()"""
+        self._cached_functions.append(cached_function)
     
     def clear_cache(self):
         """Clear all cached results"""
-        self._cache.clear()
+        for cached_function in self._cached_functions:
+            cached_function.cache_clear()
         logger.info("Performance cache cleared")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss statistics across all cached functions"""
+        infos = [cached_function.cache_info() for cached_function in self._cached_functions]
+        hits = sum(info.hits for info in infos)
+        misses = sum(info.misses for info in infos)
+        return {
+            'size': sum(info.currsize for info in infos),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / max(1, hits + misses)
+        }
 
 
 # Global cache instance
 _performance_cache = PerformanceCache()
 
+# The singleton already holds one instance of each model per process, so its
+# getters are exposed directly instead of being wrapped in st.cache_resource.
+get_embeddings_model = _performance_cache.get_embeddings_model
+get_llm_model = _performance_cache.get_llm_model
+embed_batch = _performance_cache.embed_batch
+
 
 @contextmanager
 def performance_timer(operation_name: str):
@@ -95,45 +147,119 @@ def performance_timer(operation_name: str):
         logger.info(f"Completed: {operation_name} in {elapsed:.2f} seconds")
 
 
+def _make_cache_key(func: Callable, args: tuple, kwargs: dict) -> Optional[bytes]:
+    """
+    Build a fixed-size cache key for a call with unhashable arguments.
+    
+    The arguments are pickled and hashed with BLAKE2b, so the key is always
+    16 bytes no matter how large the arguments are. Returns None when the
+    arguments cannot be pickled.
+    """
+    try:
+        payload = pickle.dumps(
+            (func.__qualname__, args, tuple(sorted(kwargs.items()))),
+            protocol=5
+        )
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
 def cache_expensive_operation(cache_key: str = None, ttl: int = 3600):
-    """Decorator to cache expensive operations"""
+    """
+    Decorator to cache expensive operations.
+    
+    Calls are memoised with functools.lru_cache keyed on the call arguments
+    and on a time bucket ``ttl`` seconds wide. A result is reused until the
+    current bucket ends, so it lives for anywhere between 0 and ``ttl``
+    seconds depending on when in the bucket it was computed. Calls with
+    unhashable arguments, or with an explicit ``cache_key``, fall back to a
+    TTLCache owned by the decorated function that expires each entry exactly
+    ``ttl`` seconds after it is stored. ``wrapper.cache_info()`` reports hits
+    and misses over both tiers, and every decorated function is included in
+    ``PerformanceCache.stats()``.
+    
+    Raises:
+        ValueError: If ``ttl`` is not positive
+    """
+    if ttl <= 0:
+        raise ValueError(f"ttl must be positive, got {ttl}")
+    
     def decorator(func: Callable):
+        fallback_cache = TTLCache(maxsize=128, ttl=ttl)
+        # TTLCache is not thread-safe and Streamlit serves sessions from threads
+        fallback_lock = threading.Lock()
+        fallback_stats = {'hits': 0, 'misses': 0}
+        
+        def timed_call(*args, **kwargs):
+            # Timed inline rather than with performance_timer, which costs a
+            # generator and two INFO log records on every cache miss.
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Computed %s in %.3fs", func.__name__, time.perf_counter() - start)
+        
+        @functools.lru_cache(maxsize=128)
+        def cached_call(ttl_bucket: int, args: tuple, frozen_kwargs: frozenset):
+            return timed_call(*args, **dict(frozen_kwargs))
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Generate cache key if not provided
-            key = cache_key or f"{func.__name__}_{str(args)}_{str(kwargs)}"
+            if cache_key is None:
+                try:
+                    frozen_kwargs = frozenset(kwargs.items())
+                    hash(args)
+                except TypeError:
+                    pass
+                else:
+                    # The bucket changes every ``ttl`` seconds, so stale
+                    # entries stop matching and age out of the LRU.
+                    return cached_call(int(time.monotonic() // ttl), args, frozen_kwargs)
+            
+            key = cache_key or _make_cache_key(func, args, kwargs)
+            if key is None:
+                logger.debug("Arguments for %s cannot be cached", func.__name__)
+                return func(*args, **kwargs)
             
             # Try to get from cache
-            cached_result = _performance_cache.get_cached_result(key)
+            with fallback_lock:
+                cached_result = fallback_cache.get(key)
+                fallback_stats['misses' if cached_result is None else 'hits'] += 1
             if cached_result is not None:
-                logger.debug(f"Cache hit for {key}")
+                logger.debug("Cache hit for %s", func.__name__)
                 return cached_result
             
             # Execute function and cache result
-            with performance_timer(f"Computing {func.__name__}"):
-                result = func(*args, **kwargs)
-                _performance_cache.cache_result(key, result)
-                logger.debug(f"Cached result for {key}")
-                return result
+            result = timed_call(*args, **kwargs)
+            with fallback_lock:
+                fallback_cache[key] = result
+            return result
         
+        def cache_info() -> CacheInfo:
+            lru_info = cached_call.cache_info()
+            with fallback_lock:
+                return CacheInfo(
+                    hits=lru_info.hits + fallback_stats['hits'],
+                    misses=lru_info.misses + fallback_stats['misses'],
+                    maxsize=lru_info.maxsize + fallback_cache.maxsize,
+                    currsize=lru_info.currsize + fallback_cache.currsize
+                )
+        
+        def cache_clear():
+            cached_call.cache_clear()
+            with fallback_lock:
+                fallback_cache.clear()
+                fallback_stats.update(hits=0, misses=0)
+        
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        _performance_cache.register(wrapper)
         return wrapper
     return decorator
 
 
-@st.cache_resource(show_spinner=False)
-def get_cached_embeddings_model():
-    """Streamlit cached embeddings model - optimized"""
-    with performance_timer("Loading embeddings model"):
-        return _performance_cache.get_embeddings_model()
-
-
-@st.cache_resource(show_spinner=False)
-def get_cached_llm_model():
-    """Streamlit cached LLM model - optimized"""
-    with performance_timer("Loading LLM model"):
-        return _performance_cache.get_llm_model()
-
-
 @st.cache_data(ttl=3600)
 def cache_document_processing(_file_content: bytes, filename: str) -> Dict[str, Any]:
     """Cache document processing results"""
@@ -164,28 +290,31 @@ def lazy_load_component(component_name: str):
     return decorator
 
 
+# Defaults applied to every new session. last_activity starts as None and is
+# set on the first update_activity() call.
+_DEFAULT_SESSION_STATE = {
+    'performance_cache_initialized': False,
+    'models_loaded': False,
+    'current_chat_id': None,
+    'chat_history': [],
+    'vectorstore': None,
+    'conversation': None,
+    'processing': False,
+    'relevant_context': "",
+    'show_new_chat_dialog': False,
+    'last_activity': None
+}
+
+
 class SessionStateManager:
     """Manages Streamlit session state efficiently"""
     
     @staticmethod
     def initialize_defaults():
         """Initialize default session state values"""
-        defaults = {
-            'performance_cache_initialized': False,
-            'models_loaded': False,
-            'current_chat_id': None,
-            'chat_history': [],
-            'vectorstore': None,
-            'conversation': None,
-            'processing': False,
-            'relevant_context': "",
-            'show_new_chat_dialog': False,
-            'last_activity': time.time()
-        }
-        
-        for key, default_value in defaults.items():
-            if key not in st.session_state:
-                st.session_state[key] = default_value
+        for key, default_value in _DEFAULT_SESSION_STATE.items():
+            # Copy so sessions never share a mutable default such as a list
+            st.session_state.setdefault(key, copy.copy(default_value))
     
     @staticmethod
     def update_activity():
@@ -197,62 +326,78 @@ class SessionStateManager:
         """Check if session has expired"""
         if 'last_activity' not in st.session_state:
             return True
+        if st.session_state.last_activity is None:
+            # No activity recorded yet, so the session has just started
+            return False
         return time.time() - st.session_state.last_activity > timeout_seconds
 
 
 def preload_models():
-    """Preload models in background - optimized for speed"""
-    if not st.session_state.get('models_loaded', False):
-        # Use a more subtle loading indicator
-        placeholder = st.empty()
-        placeholder.info("🚀 Loading AI models...")
-        
+    """
+    Warm up the models in a background thread.
+    
+    Loading is kicked off once per session and does not block the current
+    script run, so the first render is not held up by model initialisation.
+    ``models_loaded`` is set in session state when both models are ready.
+    """
+    if st.session_state.get('_preload_started', False):
+        return
+    st.session_state['_preload_started'] = True
+    
+    def _warm_up():
         try:
-            # Load models without blocking UI
-            get_cached_embeddings_model()
-            get_cached_llm_model()
-            
+            get_embeddings_model()
+            get_llm_model()
             st.session_state.models_loaded = True
-            placeholder.empty()  # Remove loading message immediately
-            
         except Exception as e:
-            placeholder.error(f"Failed to load models: {e}")
             logger.error(f"Model loading failed: {e}")
+    
+    thread = threading.Thread(target=_warm_up, name="model-preload", daemon=True)
+    # Attach the script context so the thread can use session state
+    add_script_run_ctx(thread)
+    thread.start()
+
+
+# Hide Streamlit elements that cause recomputation
+_HIDE_STREAMLIT_STYLE = """
+    <style>
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    .stDeployButton {display:none;}
+    .stApp > header {display: none;}
+    
+    /* Reduce recomputation triggers */
+    .main .block-container {
+        padding-top: 1rem;
+    }
+    
+    /* Cache-friendly styling */
+    .element-container {
+        will-change: auto;
+    }
+    
+    /* Reduce visual lag */
+    .stSpinner > div {
+        border-width: 2px;
+    }
+    </style>
+"""
+
+_optimized = False
 
 
 def optimize_streamlit_performance():
     """Apply Streamlit performance optimizations"""
-    # Configure Streamlit for better performance
-    if hasattr(st, '_config'):
+    global _optimized
+    
+    # Configure Streamlit for better performance; the options are process-wide
+    if not _optimized and hasattr(st, '_config'):
         st._config.set_option('server.runOnSave', False)
         st._config.set_option('server.allowRunOnSave', False)
+        _optimized = True
     
-    # Hide Streamlit elements that cause recomputation
-    hide_streamlit_style = """
-        <style>
-        #MainMenu {visibility: hidden;}
-        footer {visibility: hidden;}
-        .stDeployButton {display:none;}
-        .stApp > header {display: none;}
-        
-        /* Reduce recomputation triggers */
-        .main .block-container {
-            padding-top: 1rem;
-        }
-        
-        /* Cache-friendly styling */
-        .element-container {
-            will-change: auto;
-        }
-        
-        /* Reduce visual lag */
-        .stSpinner > div {
-            border-width: 2px;
-        }
-        </style>
-    """
-    
-    st.markdown(hide_streamlit_style, unsafe_allow_html=True)
+    # The page is rebuilt on every rerun, so the style has to be emitted each time
+    st.markdown(_HIDE_STREAMLIT_STYLE, unsafe_allow_html=True)
 
 
 # Performance monitoring
@@ -261,22 +406,24 @@ class PerformanceMonitor:
     
     def __init__(self):
         self.start_time = time.time()
-        self.operation_times = {}
+        # Keep only the last 100 measurements per operation
+        self.operation_times = collections.defaultdict(lambda: collections.deque(maxlen=100))
+        # Running sum of the samples currently held for each operation
+        self.operation_sums = collections.defaultdict(float)
     
     def log_operation(self, operation: str, duration: float):
         """Log operation duration"""
-        if operation not in self.operation_times:
-            self.operation_times[operation] = []
-        self.operation_times[operation].append(duration)
-        
-        if len(self.operation_times[operation]) > 100:
-            # Keep only last 100 measurements
-            self.operation_times[operation] = self.operation_times[operation][-100:]
+        times = self.operation_times[operation]
+        if len(times) == times.maxlen:
+            # The oldest sample is about to be evicted by append()
+            self.operation_sums[operation] -= times[0]
+        times.append(duration)
+        self.operation_sums[operation] += duration
     
     def get_average_time(self, operation: str) -> float:
         """Get average time for an operation"""
-        times = self.operation_times.get(operation, [])
-        return sum(times) / len(times) if times else 0.0
+        times = self.operation_times.get(operation)
+        return self.operation_sums[operation] / len(times) if times else 0.0
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
@@ -286,7 +433,8 @@ class PerformanceMonitor:
                 op: self.get_average_time(op) 
                 for op in self.operation_times.keys()
             },
-            'total_operations': sum(len(times) for times in self.operation_times.values())
+            'total_operations': sum(len(times) for times in self.operation_times.values()),
+            'cache': _performance_cache.stats()
         }
 
 
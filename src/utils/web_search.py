@@ -3,11 +3,10 @@ Web search utilities for SAVIN AI application.
 Provides Wikipedia and DuckDuckGo search integration with error handling and result formatting.
 """
 
+import functools
 import logging
 import asyncio
 from typing import List, Dict, Any, Optional, Union
-import duckduckgo_search as ddgs
-import wikipedia
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
@@ -20,6 +19,27 @@ from ..core.exceptions import SearchError
 logger = logging.getLogger(__name__)
 
 
+def _truncate(text: str, limit: int = 500) -> str:
+    """Shorten text to at most ``limit`` characters, ending with an ellipsis"""
+    return text if len(text) <= limit else f"{text[:limit - 3]}..."
+
+
+@functools.lru_cache(maxsize=1)
+def _wiki():
+    """Import and configure the wikipedia client on first use"""
+    import wikipedia
+    wikipedia.set_lang("en")
+    wikipedia.set_rate_limiting(True)
+    return wikipedia
+
+
+@functools.lru_cache(maxsize=1)
+def _ddgs():
+    """Import the DuckDuckGo search client class on first use"""
+    from duckduckgo_search import DDGS
+    return DDGS
+
+
 class WikipediaSearcher:
     """
     Handles Wikipedia search operations with error handling and result formatting.
@@ -27,14 +47,13 @@ class WikipediaSearcher:
     
     def __init__(self):
         self.config = SearchConfig()
-        # Configure Wikipedia settings
-        wikipedia.set_lang("en")
-        wikipedia.set_rate_limiting(True)
     
     def search(self, query: str, max_results: Optional[int] = None) -> List[SearchResult]:
         """
         Search Wikipedia for relevant articles.
         
+        Pages for the matching titles are fetched concurrently.
+        
         Args:
             query: Search query
             max_results: Maximum number of results to return
@@ -46,70 +65,22 @@ class WikipediaSearcher:
             SearchError: If search fails
         """
         max_results = max_results or self.config.MAX_SEARCH_RESULTS
+        wikipedia = _wiki()
         
         try:
             logger.info(f"Searching Wikipedia for: {query}")
             
             # Search for pages
             search_results = wikipedia.search(query, results=max_results * 2)  # Get more to filter
-            results = []
+            titles = search_results[:max_results]
+            if not titles:
+                return []
             
-            for title in search_results[:max_results]:
-                try:
-                    page = wikipedia.page(title, auto_suggest=self.config.WIKIPEDIA_AUTO_SUGGEST)
-                    
-                    # Get summary with sentence limit
-                    summary = wikipedia.summary(
-                        title, 
-                        sentences=self.config.WIKIPEDIA_SENTENCES,
-                        auto_suggest=self.config.WIKIPEDIA_AUTO_SUGGEST
-                    )
-                    
-                    # Limit summary length
-                    if len(summary) > 500:
-                        summary = summary[:497] + "..."
-                    
-                    result = SearchResult(
-                        title=page.title,
-                        url=page.url,
-                        summary=summary,
-                        source="Wikipedia"
-                    )
-                    
-                    results.append(result)
-                    
-                    if len(results) >= max_results:
-                        break
-                        
-                except wikipedia.exceptions.DisambiguationError as e:
-                    # Handle disambiguation by taking the first option
-                    try:
-                        page = wikipedia.page(e.options[0])
-                        summary = wikipedia.summary(e.options[0], sentences=self.config.WIKIPEDIA_SENTENCES)
-                        
-                        if len(summary) > 500:
-                            summary = summary[:497] + "..."
-                        
-                        result = SearchResult(
-                            title=page.title,
-                            url=page.url,
-                            summary=summary,
-                            source="Wikipedia"
-                        )
-                        
-                        results.append(result)
-                        
-                    except Exception as inner_e:
-                        logger.warning(f"Failed to resolve disambiguation for {title}: {inner_e}")
-                        continue
-                        
-                except wikipedia.exceptions.PageError:
-                    logger.warning(f"Wikipedia page not found: {title}")
-                    continue
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing Wikipedia page {title}: {e}")
-                    continue
+            # Each title costs its own round trips, so fetch them in parallel;
+            # map() keeps the search ranking order.
+            with ThreadPoolExecutor(max_workers=len(titles)) as executor:
+                fetched = executor.map(self._fetch_page, titles)
+                results = [result for result in fetched if result is not None]
             
             logger.info(f"Found {len(results)} Wikipedia results")
             return results
@@ -117,6 +88,66 @@ class WikipediaSearcher:
         except Exception as e:
             logger.error(f"Wikipedia search failed: {e}")
             raise SearchError(f"Wikipedia search failed: {str(e)}", "WIKIPEDIA_ERROR")
+    
+    def _fetch_page(self, title: str) -> Optional[SearchResult]:
+        """
+        Fetch a single Wikipedia page and build its search result.
+        
+        Args:
+            title: Page title returned by the search
+            
+        Returns:
+            SearchResult, or None if the page could not be resolved
+        """
+        wikipedia = _wiki()
+        
+        try:
+            page = wikipedia.page(title, auto_suggest=self.config.WIKIPEDIA_AUTO_SUGGEST)
+            summary = _truncate(self._limit_sentences(page.summary))
+            
+            return SearchResult(
+                title=page.title,
+                url=page.url,
+                summary=summary,
+                source="Wikipedia"
+            )
+                
+        except wikipedia.exceptions.DisambiguationError as e:
+            # Handle disambiguation by taking the first option
+            try:
+                page = wikipedia.page(e.options[0])
+                summary = _truncate(self._limit_sentences(page.summary))
+                
+                return SearchResult(
+                    title=page.title,
+                    url=page.url,
+                    summary=summary,
+                    source="Wikipedia"
+                )
+                
+            except Exception as inner_e:
+                logger.warning(f"Failed to resolve disambiguation for {title}: {inner_e}")
+                return None
+                
+        except wikipedia.exceptions.PageError:
+            logger.warning(f"Wikipedia page not found: {title}")
+            return None
+            
+        except Exception as e:
+            logger.warning(f"Error processing Wikipedia page {title}: {e}")
+            return None
+    
+    def _limit_sentences(self, summary: str) -> str:
+        """
+        Trim a page summary to the configured number of sentences.
+        
+        The summary already loaded on the page is reused instead of asking
+        the API for it again via wikipedia.summary().
+        """
+        sentences = summary.split('. ')
+        if len(sentences) <= self.config.WIKIPEDIA_SENTENCES:
+            return summary
+        return '. '.join(sentences[:self.config.WIKIPEDIA_SENTENCES]) + '.'
 
 
 class DuckDuckGoSearcher:
@@ -126,7 +157,7 @@ class DuckDuckGoSearcher:
     
     def __init__(self):
         self.config = SearchConfig()
-        self.ddgs = DDGS(
+        self.ddgs = _ddgs()(
             timeout=self.config.SEARCH_TIMEOUT
         )
     
@@ -167,14 +198,10 @@ class DuckDuckGoSearcher:
                 if not title or not url:
                     continue
                 
-                # Limit body length
-                if len(body) > 500:
-                    body = body[:497] + "..."
-                
                 search_result = SearchResult(
                     title=title,
                     url=url,
-                    summary=body,
+                    summary=_truncate(body),
                     source="DuckDuckGo"
                 )
                 
@@ -197,8 +224,8 @@ class WebSearchManager:
     """
     
     def __init__(self):
-        self.wikipedia_searcher = WikipediaSearcher()
-        self.duckduckgo_searcher = DuckDuckGoSearcher()
+        self.wikipedia_searcher = create_wikipedia_searcher()
+        self.duckduckgo_searcher = create_duckduckgo_searcher()
         self.config = SearchConfig()
     
     def search_wikipedia(self, query: str, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -251,32 +278,38 @@ class WebSearchManager:
         Returns:
             Combined list of SearchResult objects
         """
-        all_results = []
-        
+        searches = {}
         if include_wikipedia:
-            try:
-                wiki_results = self.wikipedia_searcher.search(query, max_results_per_source)
-                all_results.extend(wiki_results)
-            except SearchError as e:
-                logger.warning(f"Wikipedia search failed: {e}")
-        
+            searches["Wikipedia"] = self.wikipedia_searcher.search
         if include_web:
-            try:
-                web_results = self.duckduckgo_searcher.search(query, max_results_per_source)
-                all_results.extend(web_results)
-            except SearchError as e:
-                logger.warning(f"DuckDuckGo search failed: {e}")
+            searches["DuckDuckGo"] = self.duckduckgo_searcher.search
         
-        # Remove duplicates based on URL
-        seen_urls = set()
-        unique_results = []
+        # Both sources are independent network calls, so run them concurrently
+        results_by_source = {}
+        if searches:
+            with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+                futures = {
+                    executor.submit(search, query, max_results_per_source): source
+                    for source, search in searches.items()
+                }
+                for future in as_completed(futures):
+                    source = futures[future]
+                    try:
+                        results_by_source[source] = future.result()
+                    except SearchError as e:
+                        logger.warning(f"{source} search failed: {e}")
+        
+        # Keep Wikipedia results ahead of web results regardless of finish order
+        all_results = []
+        for source in searches:
+            all_results.extend(results_by_source.get(source, []))
         
+        # Remove duplicates based on URL, keeping the first result for each
+        unique_results = {}
         for result in all_results:
-            if result.url not in seen_urls:
-                seen_urls.add(result.url)
-                unique_results.append(result)
+            unique_results.setdefault(result.url, result)
         
-        return unique_results
+        return list(unique_results.values())
     
     def format_search_results(self, results: List[SearchResult]) -> str:
         """
@@ -291,15 +324,17 @@ class WebSearchManager:
         if not results:
             return "No search results found."
         
-        formatted = ""
+        parts = []
         
         for i, result in enumerate(results, 1):
-            formatted += f"**{i}. {result.title} 🌟**\n"
-            formatted += f"• **Source:** {result.source} 📚\n"
-            formatted += f"• **Summary:** {result.summary}\n"
-            formatted += f"• **Link:** [Visit here 🔗]({result.url})\n\n"
+            parts.append(
+                f"**{i}. {result.title} 🌟**\n"
+                f"• **Source:** {result.source} 📚\n"
+                f"• **Summary:** {result.summary}\n"
+                f"• **Link:** [Visit here 🔗]({result.url})\n\n"
+            )
         
-        return formatted
+        return "".join(parts)
     
     def create_search_context(self, results: List[SearchResult]) -> str:
         """
@@ -324,16 +359,8 @@ class WebSearchManager:
         return context
 
 
-class SearchResultFormatter:
-    """
-    Handles formatting of search results for different display contexts.
-    """
-    
-    @staticmethod
-    def format_for_chat(results: List[SearchResult], query: str) -> str:
-        """Format search results for chat display"""
-        if not results:
-            return f"""😅 **No Results Found!**
+# Fixed chat responses, filled in with str.format
+_NO_RESULTS_TEMPLATE = """😅 **No Results Found!**
 
 🎯 **What happened:**
 • No results found for "{query}" 🔍
@@ -345,53 +372,74 @@ class SearchResultFormatter:
 • **Try the other search button** for different results! 🔄
 
 ✨ **I'm here to help!** Let's find the information you need together! 😊🚀"""
+
+_ERROR_TEMPLATE = """😅 **Search Issue!**
+
+🎯 **What happened:**
+• Technical issue with {error_type} search 🛠️
+• Query: "{query}"
+
+💡 **Quick solutions:**
+• **Try a different search term** 🔄
+• **Use the other search button** instead! 🔄  
+• **Check your internet connection** 📡
+
+✨ **Don't worry!** I'm still here to help you find what you need! 😊💪"""
+
+
+class SearchResultFormatter:
+    """
+    Handles formatting of search results for different display contexts.
+    """
+    
+    @staticmethod
+    def format_for_chat(results: List[SearchResult], query: str) -> str:
+        """Format search results for chat display"""
+        if not results:
+            return _NO_RESULTS_TEMPLATE.format(query=query)
         
-        response = f"""🌟 **Search Results for: "{query}"**
+        parts = [f"""🌟 **Search Results for: "{query}"**
 
 🎯 **Quick Summary:**
 • Found {len(results)} relevant results 🌍
 • Fresh information ready for analysis! ✨
 
-📋 **Results:**"""
+📋 **Results:**"""]
         
-        for i, result in enumerate(results, 1):
-            response += f"\n• **{result.title}** - {result.summary[:100]}... 🌟"
-            response += f"\n  🔗 [Visit {result.source.lower()}]({result.url})"
+        for result in results:
+            parts.append(
+                f"\n• **{result.title}** - {_truncate(result.summary, 100)} 🌟"
+                f"\n  🔗 [Visit {result.source.lower()}]({result.url})"
+            )
         
-        response += "\n\n💡 **Pro Tip:**\n• You can ask me to combine these findings with your document content! 📄✨"
+        parts.append("\n\n💡 **Pro Tip:**\n• You can ask me to combine these findings with your document content! 📄✨")
         
-        return response
+        return "".join(parts)
     
     @staticmethod
     def format_error_response(error_type: str, query: str) -> str:
         """Format error response for search failures"""
-        return f"""😅 **Search Issue!**
-
-🎯 **What happened:**
-• Technical issue with {error_type} search 🛠️
-• Query: "{query}"
-
-💡 **Quick solutions:**
-• **Try a different search term** 🔄
-• **Use the other search button** instead! 🔄  
-• **Check your internet connection** 📡
-
-✨ **Don't worry!** I'm still here to help you find what you need! 😊💪"""
+        return _ERROR_TEMPLATE.format(error_type=error_type, query=query)
 
 
 # Factory functions
+# Searchers are shared process-wide so the DuckDuckGo client keeps its HTTP
+# session, and with it the open keep-alive connections, between searches.
+@functools.lru_cache(maxsize=1)
 def create_web_search_manager() -> WebSearchManager:
-    """Create a new web search manager instance"""
+    """Get the shared web search manager instance"""
     return WebSearchManager()
 
 
+@functools.lru_cache(maxsize=1)
 def create_wikipedia_searcher() -> WikipediaSearcher:
-    """Create a new Wikipedia searcher instance"""
+    """Get the shared Wikipedia searcher instance"""
     return WikipediaSearcher()
 
 
+@functools.lru_cache(maxsize=1)
 def create_duckduckgo_searcher() -> DuckDuckGoSearcher:
-    """Create a new DuckDuckGo searcher instance"""
+    """Get the shared DuckDuckGo searcher instance"""
     return DuckDuckGoSearcher()
 
 